@@ -0,0 +1,141 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------
+# Ridership anomaly detection.
+# Every (group, date, time slot) cell is scored
+# against a robust seasonal baseline: the median
+# and MAD of the same group and slot on the same
+# weekday. Scoring runs in bulk over a dense
+# float32 (group x day x slot) NumPy cube, one
+# weekday at a time.
+# --------------------------------------------
+
+# Modified z-score cut-off (Iglewicz & Hoaglin)
+THRESHOLD = 3.5
+
+# MAD -> standard deviation for normal data
+MAD_SCALE = 1.4826
+
+# Mean absolute deviation -> standard deviation,
+# used when more than half the history is identical
+# (MAD of 0), e.g. slots a route rarely serves
+MEAN_AD_SCALE = 1.2533
+
+# Smallest scale, in passengers, so cells with a
+# flat history don't score as infinite
+MIN_SCALE = 1.0
+
+# Minimum support before a cell can be scored: its
+# baseline needs a non-zero median over at least
+# MIN_HISTORY same-weekday days. Sparse cells (a
+# few passengers against a zero median) otherwise
+# outrank real anomalies.
+MIN_HISTORY = 8
+
+# --------------------------------------------
+# Build the dense cube. Days outside a group's
+# first..last active day are NaN, so routes that
+# start or stop mid-history don't look closed.
+# float32 holds cell totals exactly up to 2**24
+# passengers.
+# --------------------------------------------
+def build_cube(df, group_col, value_col='Passenger Count'):
+    dates = pd.to_datetime(df['Date'])
+    valid = (dates.notna() & df[group_col].notna() & df['Time Slot'].notna()).to_numpy()
+
+    group_codes, groups = pd.factorize(df[group_col].to_numpy()[valid], sort=True)
+    slot_codes, slots = pd.factorize(df['Time Slot'].to_numpy()[valid])
+
+    if not len(group_codes):
+        return {'group_col': group_col, 'groups': groups, 'slots': slots,
+                'days': pd.DatetimeIndex([]), 'values': np.zeros((0, 0, 0), dtype=np.float32)}
+
+    day = dates[valid]
+    days = pd.date_range(day.min(), day.max(), freq='D')
+    day_codes = (day - days[0]).dt.days.to_numpy()
+
+    n_groups, n_days, n_slots = len(groups), len(days), len(slots)
+    values = np.bincount(
+        (group_codes * n_days + day_codes) * n_slots + slot_codes,
+        weights=df[value_col].to_numpy(dtype=float)[valid],
+        minlength=n_groups * n_days * n_slots
+    ).reshape(n_groups, n_days, n_slots).astype(np.float32)
+
+    active = values.sum(axis=2) > 0
+    first = active.argmax(axis=1)
+    last = n_days - 1 - active[:, ::-1].argmax(axis=1)
+    day_range = np.arange(n_days)
+    outside = (day_range < first[:, None]) | (day_range > last[:, None])
+    values[outside] = np.nan
+
+    return {'group_col': group_col, 'groups': groups, 'slots': slots, 'days': days, 'values': values}
+
+# --------------------------------------------
+# Robust z-score of every cell in one weekday's
+# (group x day x slot) slice against the median
+# and MAD of its (group, slot) on that weekday.
+# Returns the scores (NaN for cells without
+# enough support) and the median, shaped
+# (group x 1 x slot).
+# --------------------------------------------
+def score_weekday(same_day):
+    with warnings.catch_warnings():
+        # Groups with no history on a weekday give all-NaN slices
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(same_day, axis=1, keepdims=True)
+        deviation = np.abs(same_day - median)
+        mad = np.nanmedian(deviation, axis=1, keepdims=True)
+        mean_ad = np.nanmean(deviation, axis=1, keepdims=True)
+    del deviation
+
+    robust = np.where(mad > 0, MAD_SCALE * mad, MEAN_AD_SCALE * mean_ad)
+    scale = np.maximum(robust, MIN_SCALE)
+    history = np.sum(~np.isnan(same_day), axis=1, keepdims=True)
+    supported = (median > 0) & (history >= MIN_HISTORY)
+    return np.where(supported, (same_day - median) / scale, np.nan), median
+
+# --------------------------------------------
+# Top-n anomalies for a grouping column, as a
+# table sorted by absolute score. Weekdays are
+# scored one slice at a time and only a running
+# top n is kept, so memory stays near the size
+# of the cube itself.
+# --------------------------------------------
+def top_anomalies(df, group_col='Route', n=20, threshold=THRESHOLD):
+    cube = build_cube(df, group_col)
+    columns = [group_col, 'Date', 'Time Slot', 'Passengers', 'Expected', 'Score']
+    values = cube['values']
+    if not values.size:
+        return pd.DataFrame(columns=columns)
+
+    weekday = cube['days'].dayofweek.to_numpy()
+    # Running top n: group, day, slot, expected, score
+    top = [np.empty(0, dtype=np.int64)] * 3 + [np.empty(0, dtype=np.float32)] * 2
+    for w in range(7):
+        days = np.flatnonzero(weekday == w)
+        if not len(days):
+            continue
+        scores, median = score_weekday(values[:, days, :])
+        magnitude = np.nan_to_num(np.abs(scores), nan=-np.inf).ravel()
+
+        k = min(n, magnitude.size)
+        best = np.argpartition(-magnitude, k - 1)[:k]
+        best = best[magnitude[best] >= threshold]
+        g, d, s = np.unravel_index(best, scores.shape)
+        found = [g, days[d], s, median[g, 0, s], scores[g, d, s]]
+
+        top = [np.concatenate([a, b]) for a, b in zip(top, found)]
+        keep = np.argsort(-np.abs(top[4]), kind='stable')[:n]
+        top = [a[keep] for a in top]
+
+    g, d, s, expected, score = top
+    return pd.DataFrame({
+        group_col: cube['groups'][g],
+        'Date': cube['days'][d].strftime('%Y-%m-%d'),
+        'Time Slot': cube['slots'][s],
+        'Passengers': values[g, d, s].astype(int),
+        'Expected': expected.round().astype(int),
+        'Score': score.astype(float).round(1)
+    }, columns=columns)
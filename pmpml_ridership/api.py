@@ -0,0 +1,257 @@
+# ---------------------------------------------------
+# PMPML RIDERSHIP JSON API
+# ---------------------------------------------------
+# Serves the dashboard aggregates from eda.py as JSON.
+# The dataset is loaded once; responses are cached on
+# (dataset version, endpoint, filters) and carry an
+# ETag for conditional requests.
+#
+# Usage: python pmpml_ridership/api.py data.csv --port 8000
+# Filters: ?year=2023&route=Route 1,Route 2&station=...
+# Export:  /export?table=rows&format=csv&formatted=1 (plus filters),
+#          streamed in chunks, not cached
+# ---------------------------------------------------
+
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import eda
+import export
+
+CACHE_SIZE = 256
+
+FILTER_PARAMS = ['year', 'route', 'station']
+
+# --------------------------------------------
+# Dataset fingerprint, used as its version in
+# cache keys and ETags.
+# --------------------------------------------
+def file_version(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+# --------------------------------------------
+# Trend frames, as built by the Trends tab:
+# last 3 years unless years are filtered.
+# --------------------------------------------
+def _trend_frames(df, df_filtered, years):
+    if years:
+        df_trend = df_filtered
+    else:
+        df_trend = df_filtered[df_filtered['Year'].isin(sorted(df['Year'].unique())[-3:])]
+    return eda.monthly_passenger_trend(df_trend), eda.monthly_fare_trend(df_trend)
+
+def _records(df):
+    return json.loads(df.to_json(orient='records'))
+
+# --------------------------------------------
+# Endpoint handlers: (full df, filtered df,
+# filters) -> JSON-serializable payload.
+# --------------------------------------------
+def _top_routes(df, df_filtered, filters):
+    return _records(eda.top_routes(df_filtered).reset_index())
+
+def _peak_time_slots(df, df_filtered, filters):
+    return _records(eda.peak_time_slots(df_filtered).iloc[::-1])
+
+def _route_peak_timeslot(df, df_filtered, filters):
+    return _records(eda.route_peak_timeslot(df_filtered).reset_index())
+
+def _monthly_passenger_trend(df, df_filtered, filters):
+    return _records(_trend_frames(df, df_filtered, filters[0])[0])
+
+def _insights(df, df_filtered, filters):
+    monthly_pass, monthly_fare = _trend_frames(df, df_filtered, filters[0])
+    return {
+        'overview': eda.generate_overview_insight(df_filtered),
+        'routes': eda.generate_routes_insight(df_filtered),
+        'stations': eda.generate_stations_insight(df_filtered),
+        'trends': eda.generate_trends_insight(
+            monthly_pass, monthly_fare,
+            eda.yearly_ridership(df_filtered), eda.weekday_pattern(df_filtered)
+        ),
+        'fare': eda.generate_fare_insight(df_filtered)
+    }
+
+ENDPOINTS = {
+    '/top_routes': _top_routes,
+    '/peak_time_slots': _peak_time_slots,
+    '/route_peak_timeslot': _route_peak_timeslot,
+    '/monthly_passenger_trend': _monthly_passenger_trend,
+    '/insights': _insights
+}
+
+# --------------------------------------------
+# Loaded dataset plus an LRU response cache.
+# --------------------------------------------
+class RidershipService:
+    def __init__(self, path, cache_size=CACHE_SIZE):
+        self.df = eda.load_and_clean_data(path)
+        self.version = file_version(path)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, endpoint, filters):
+        """Return (etag, body bytes) for an endpoint and filter tuple."""
+        key = (self.version, endpoint, filters)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        df_filtered = eda.filter_data(self.df, *filters)
+        payload = ENDPOINTS[endpoint](self.df, df_filtered, filters)
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        entry = (f'"{self.version}-{hashlib.sha1(body).hexdigest()[:16]}"', body)
+
+        with self._lock:
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+# --------------------------------------------
+# Normalize query filters into a hashable
+# (years, routes, stations) tuple. Values can be
+# repeated or comma-separated.
+# --------------------------------------------
+def parse_filters(query):
+    params = parse_qs(query)
+    filters = []
+    for name in FILTER_PARAMS:
+        values = [v.strip() for raw in params.get(name, []) for v in raw.split(',') if v.strip()]
+        filters.append(tuple(sorted(set(values))) or None)
+    if filters[0]:
+        filters[0] = tuple(sorted(int(y) for y in filters[0]))
+    return tuple(filters)
+
+# --------------------------------------------
+# HTTP handler.
+# --------------------------------------------
+class RequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if url.path in ('/', '/health'):
+            self._send_json(200, {
+                'status': 'ok',
+                'dataset_version': self.service.version,
+                'rows': len(self.service.df),
+                'endpoints': sorted(ENDPOINTS) + ['/export']
+            })
+            return
+
+        if url.path == '/export':
+            self._send_export(url.query)
+            return
+
+        if url.path not in ENDPOINTS:
+            self._send_json(404, {'error': f'Unknown endpoint: {url.path}'})
+            return
+
+        try:
+            filters = parse_filters(url.query)
+        except ValueError:
+            self._send_json(400, {'error': 'year must be an integer'})
+            return
+
+        etag, body = self.service.get(url.path, filters)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Streams the export; without a Content-Length the body
+    # ends when the connection closes (HTTP/1.0)
+    def _send_export(self, query):
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        table = params.get('table', 'rows')
+        formats = {name.lower(): name for name in export.available_formats()}
+        fmt = formats.get(params.get('format', 'csv').lower())
+        if table not in export.TABLES or fmt is None:
+            self._send_json(400, {
+                'error': 'Unknown table or format',
+                'tables': list(export.TABLES), 'formats': list(formats)
+            })
+            return
+
+        try:
+            filters = parse_filters(query)
+        except ValueError:
+            self._send_json(400, {'error': 'year must be an integer'})
+            return
+
+        df = self.service.df
+        mask = eda.filter_mask(df, *filters)
+        formatted = params.get('formatted', '0').lower() in ('1', 'true', 'yes')
+
+        self.send_response(200)
+        self.send_header('Content-Type', export.FORMATS[fmt][1])
+        self.send_header('Content-Disposition', f'attachment; filename="{export.file_name(table, fmt)}"')
+        self.end_headers()
+        for block in export.iter_export(df, table, fmt, formatted, mask):
+            self.wfile.write(block)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# --------------------------------------------
+# Threaded server with a listen backlog large
+# enough for bursts of concurrent clients.
+# --------------------------------------------
+class RidershipServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+def make_server(path, host='127.0.0.1', port=8000):
+    handler = type('Handler', (RequestHandler,), {'service': RidershipService(path)})
+    return RidershipServer((host, port), handler)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PMPML ridership JSON API")
+    parser.add_argument('csv', help="Path to the PMPML ridership CSV file")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.csv, args.host, args.port)
+    print(f"Serving {args.csv} (version {server.RequestHandlerClass.service.version}) "
+          f"on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -4,19 +4,42 @@
 # Built with: Streamlit, Pandas, Matplotlib
 # ---------------------------------------------------
 
-import pandas as pd
+import os
+import json
+from functools import partial
 import streamlit as st
-import eda
-import plots
-from streamlit_lottie import st_lottie
 from utils import format_inr, format_dataframe_inr
-import json
+
+# Heavy modules (pandas, NumPy, matplotlib via the render
+# workers) are imported on first upload, so the upload
+# screen paints without them.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Set PMPML_ANIMATION=off to skip the Lottie header
+# (and the streamlit_lottie import) for faster startup.
+SHOW_ANIMATION = os.environ.get("PMPML_ANIMATION", "on").lower() != "off"
+
+# ---------------------------------------------------
+# Static Assets
+# Read and parsed once per process, not on every rerun.
+# ---------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def load_css(filepath: str):
+    """Read a local CSS file"""
+    with open(filepath) as f:
+        return f.read()
+
+@st.cache_resource(show_spinner=False)
+def load_lottiefile(filepath: str):
+    """Load a local Lottie JSON animation"""
+    with open(filepath, "r") as f:
+        return json.load(f)
 
 # ---------------------------------------------------
 # Load custom CSS
 # ---------------------------------------------------
-with open('pmpml_ridership/style.css') as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+st.markdown(f"<style>{load_css(os.path.join(BASE_DIR, 'style.css'))}</style>", unsafe_allow_html=True)
 
 # ---------------------------------------------------
 # Streamlit Config
@@ -27,24 +50,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ---------------------------------------------------
-# Lottie Loader Function
-# ---------------------------------------------------
-def load_lottiefile(filepath: str):
-    """Load a local Lottie JSON animation"""
-    with open(filepath, "r") as f:
-        return json.load(f)
-
-# Load bus animation
-lottie_bus = load_lottiefile("pmpml_ridership/bus.json")
-
 # ---------------------------------------------------
 # Header with Bus Animation + Title
 # ---------------------------------------------------
 col1, col2 = st.columns([1, 1.85])
 with col1:
-    if lottie_bus:
-        st_lottie(lottie_bus, speed=2, width=300, height=300, key="bus")
+    if SHOW_ANIMATION:
+        from streamlit_lottie import st_lottie
+        lottie_bus = load_lottiefile(os.path.join(BASE_DIR, "bus.json"))
+        if lottie_bus:
+            st_lottie(lottie_bus, speed=2, width=300, height=300, key="bus")
 with col2:
     st.markdown(
         """
@@ -97,7 +112,14 @@ def show_documentation():
 # File Upload
 # ---------------------------------------------------
 uploaded_file = st.file_uploader("📂 Upload PMPML CSV file", type=["csv"])
-if not uploaded_file:
+
+# Partitioned multi-operator dataset (see partitions.py); an upload takes precedence
+dataset_dir = "" if uploaded_file else st.text_input(
+    "📁 Or open a partitioned dataset folder",
+    value=os.environ.get("PMPML_DATASET", ""), placeholder="dataset/"
+).strip()
+
+if not uploaded_file and not dataset_dir:
     st.info("📌 Upload your CSV file to get started!")
     st.markdown("---")
 
@@ -109,131 +131,538 @@ if not uploaded_file:
         show_documentation()
         st.session_state.doc_shown = True
 
+# ---------------------------------------------------
+# Cached Data Loading
+# Keyed on the upload id and time slot settings, so
+# reruns reuse the cleaned frame and its stratified sample.
+# ---------------------------------------------------
+@st.cache_resource(show_spinner="Loading data...", max_entries=1)
+def load_data(data_key, _uploaded_file):
+    _, slot_width, peak_windows = data_key
+    _uploaded_file.seek(0)
+    return eda.load_and_clean_data(_uploaded_file, slot_width, peak_windows)
+
+@st.cache_resource(show_spinner="Sampling data...", max_entries=1)
+def load_sample(data_key, _df):
+    return approx.stratified_sample(_df)
+
+# Distinct-count bitsets per (date, route) and (date, station)
+@st.cache_resource(show_spinner="Building distinct-count bitsets...", max_entries=1)
+def load_distinct_indexes(data_key, _df):
+    return (
+        sketch.build_distinct_index(_df, ['Year', 'Date', 'Boarding Station'], 'Route'),
+        sketch.build_distinct_index(_df, ['Year', 'Date', 'Route'], 'Boarding Station')
+    )
+
+# Distinct route and station counts for a filter selection, merged
+# from the bitsets, and the stations insight that uses them
+@st.cache_resource(show_spinner=False, max_entries=8)
+def distinct_counts(data_key, filter_key, _indexes, _df_filtered):
+    route_index, station_index = _indexes
+    years, routes, stations = filter_key
+    years = [int(y) for y in years] if years else None
+
+    def count_station_routes(station):
+        return sketch.count_distinct(route_index, {'Year': years, 'Boarding Station': [station]}, routes)
+
+    return {
+        'routes': sketch.count_distinct(route_index, {'Year': years, 'Boarding Station': stations}, routes),
+        'stations': sketch.count_distinct(station_index, {'Year': years, 'Route': routes}, stations),
+        'stations_insight': eda.generate_stations_insight(_df_filtered, count_station_routes)
+    }
+
+# Years and months offered by the Compare tab
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_period_options(data_key, _df):
+    return compare.period_options(_df)
+
+# Delta tables, charts and insight for two periods under the route
+# and station filters (the year filter does not apply)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def compare_periods(data_key, routes, stations, period_a, period_b, _df):
+    mask = eda.filter_mask(_df, None, routes, stations)
+    aligned = compare.aligned_aggregate(_df, period_a, period_b, mask)
+    deltas = {dim: compare.delta_table(aligned, dim, period_a, period_b) for dim in compare.COMPARE_KEYS}
+    charts = render.render_figures({
+        dim: ("plot_period_delta", (deltas[dim], dim, f"{dim}: {period_b} vs {period_a}"))
+        for dim in compare.COMPARE_KEYS
+    })
+    return deltas, charts, eda.generate_comparison_insight(deltas['Route'], period_a, period_b)
+
+# Sort permutations and search indexes for the record explorer
+@st.cache_resource(show_spinner="Indexing records...", max_entries=1)
+def load_explorer_index(data_key, _df):
+    return explorer.build_explorer_index(_df)
+
+# Passenger Count percentile sketches per (route, slot, day)
+@st.cache_resource(show_spinner="Building percentile sketches...", max_entries=1)
+def load_quantile_sketches(data_key, _df):
+    return quantiles.build_sketches(_df)
+
+# Partition summaries, reread only when partitions change on disk
+@st.cache_resource(show_spinner="Reading partition summaries...", max_entries=1)
+def load_catalog(dataset_dir, fingerprint):
+    return partitions.load_catalog(dataset_dir)
+
+# Rows of the partitions left after pruning; the Compare tab
+# keeps its own entry when the year filter is set
+@st.cache_resource(show_spinner="Loading partitions...", max_entries=2)
+def load_partition_data(data_key, _partitions):
+    _, slot_width, peak_windows = data_key
+    return partitions.load_partitions(_partitions, slot_width, peak_windows)
+
+# Row positions of the current selection, in sort order
+@st.cache_resource(show_spinner=False, max_entries=8)
+def explorer_selection(data_key, filter_key, search_col, query, sort_col, _df, _index):
+    mask = eda.filter_mask(_df, *filter_key)
+    if query:
+        mask &= explorer.search_mask(_index, search_col, query)
+    return explorer.sorted_selection(_index, mask, sort_col)
+
+# ---------------------------------------------------
+# Exact Aggregates
+# Everything the tabs show that depends only on the
+# data and filters: the filtered rows, aggregates,
+# insights, anomaly tables and rendered charts. Runs
+# inline, or as the background job in approximate
+# preview mode, which stops between stages once
+# `stop` is set.
+# ---------------------------------------------------
+def compute_exact(df, filters, stop=None):
+    df_filtered = eda.filter_data(df, *filters)
+
+    if filters[0]:
+        trend_years = [int(y) for y in filters[0]]
+    else:
+        trend_years = sorted(df['Year'].unique())[-3:]
+    df_trend = df_filtered[df_filtered['Year'].isin(trend_years)]
+
+    monthly_pass = eda.monthly_passenger_trend(df_trend)
+    monthly_fare = eda.monthly_fare_trend(df_trend)
+    yearly_pass = eda.yearly_ridership(df_filtered)
+    df_wday = eda.weekday_pattern(df_filtered)
+    route_daily = trends.daily_matrix(df_filtered, 'Route')
+    station_daily = trends.daily_matrix(df_filtered, 'Boarding Station')
+    approx.check_stop(stop)
+
+    # Independent figures are drawn in parallel worker processes
+    charts = render.render_figures({
+        "weekday_vs_weekend": ("plot_weekday_vs_weekend", (eda.weekday_vs_weekend(df_filtered),)),
+        "timeslot": ("plot_passengers_by_timeslot", (eda.peak_time_slots(df_filtered),)),
+        "routes": ("plot_passengers_by_route", (eda.top_routes(df_filtered),)),
+        "monthly_pass": ("plot_monthly_trend", (monthly_pass, 'Passenger Count', "Monthly Passenger Trend")),
+        "monthly_fare": ("plot_monthly_trend", (monthly_fare, 'Fare Collected', "Monthly Fare Collection Trend")),
+        "yearly": ("plot_yearly_ridership", (yearly_pass,)),
+        "weekday": ("plot_weekday_pattern", (df_wday,)),
+        "fare_route": ("plot_fare_by_route", (eda.fare_by_route(df_filtered),)),
+        "fare_station": ("plot_fare_by_station", (eda.fare_by_station(df_filtered),)),
+        "rolling": ("plot_rolling_trend", (trends.trend_frame(route_daily), "Daily Ridership with Moving Averages")),
+        "wow_routes": ("plot_wow_change", (trends.week_over_week_movers(route_daily), 'Route', "Routes: Week-over-Week Change")),
+        "wow_stations": ("plot_wow_change", (trends.week_over_week_movers(station_daily), 'Boarding Station', "Stations: Week-over-Week Change")),
+    }, stop)
+    approx.check_stop(stop)
+
+    return {
+        'df_filtered': df_filtered,
+        'trend_years': trend_years,
+        'charts': charts,
+        'passengers': eda.total_passengers(df_filtered),
+        'fare': eda.total_fare(df_filtered),
+        'avg_daily': int(eda.daily_ridership(df_filtered).mean()),
+        'route_peak_timeslot': eda.route_peak_timeslot(df_filtered),
+        'route_weekday_weekend': eda.route_weekday_weekend(df_filtered),
+        'busiest_stations': eda.busiest_stations(df_filtered).reset_index().rename(columns={"index": "Boarding Station"}),
+        'station_vs_routes': eda.station_vs_routes(df_filtered),
+        'yearly_fare': eda.yearly_fare(df_filtered),
+        'route_anomalies': anomaly.top_anomalies(df_filtered, 'Route'),
+        'station_anomalies': anomaly.top_anomalies(df_filtered, 'Boarding Station'),
+        'insights': {
+            'overview': eda.generate_overview_insight(df_filtered),
+            'routes': eda.generate_routes_insight(df_filtered),
+            'trends': eda.generate_trends_insight(monthly_pass, monthly_fare, yearly_pass, df_wday),
+            'fare': eda.generate_fare_insight(df_filtered)
+        }
+    }
+
+# Exact results per dataset and filter selection, so reruns from
+# widgets that don't change the filters (pages, tabs) reuse them
+@st.cache_resource(show_spinner=False, max_entries=8)
+def exact_results(data_key, filter_key, _df, _stop=None):
+    return compute_exact(_df, filter_key, _stop)
+
+# ---------------------------------------------------
+# Approximate Preview
+# Sample estimates with 95% CIs, shown until the
+# exact aggregates finish in the background.
+# ---------------------------------------------------
+def show_approximate_preview(sample):
+    passengers, passengers_ci = approx.total_passengers(sample)
+    fare, fare_ci = approx.total_fare(sample)
+
+    col1, col2 = st.columns(2)
+    col1.metric("👥 Total Passengers (approx.)", f"≈ {format_inr(passengers)}",
+                help=f"95% CI: ± {format_inr(passengers_ci)}")
+    col2.metric("💰 Total Fare Collected (approx.)", f"≈ ₹ {format_inr(fare)}",
+                help=f"95% CI: ± ₹ {format_inr(fare_ci)}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        with st.expander("📊 Weekday vs Weekend (approx.)", expanded=True):
+            st.dataframe(format_dataframe_inr(approx.weekday_vs_weekend(sample)))
+        with st.expander("⏰ Peak Time Slots (approx.)", expanded=True):
+            st.dataframe(format_dataframe_inr(approx.peak_time_slots(sample)))
+    with col2:
+        with st.expander("🚌 Top 10 Routes (approx.)", expanded=True):
+            st.dataframe(format_dataframe_inr(approx.top_routes(sample).head(10)))
+        with st.expander("🚏 Top 10 Boarding Stations (approx.)", expanded=True):
+            st.dataframe(format_dataframe_inr(approx.busiest_stations(sample).head(10)))
+
+# ---------------------------------------------------
+# Metrics
+# Each metric is written into its column once its
+# value is known, so summary answers can show before
+# the rows are read; None leaves the column empty.
+# ---------------------------------------------------
+METRICS = {
+    'passengers': ("👥 Total Passengers", "{}"),
+    'avg_daily': ("📅 Avg Daily Passengers", "{}"),
+    'routes': ("🚌 Total Routes", "{}"),
+    'stations': ("🚏 Total Stations", "{}"),
+    'fare': ("💰 Total Fare Collected", "₹ {}")
+}
+
+def show_metrics(cols, values):
+    for col, (key, (label, template)) in zip(cols, METRICS.items()):
+        if values.get(key) is not None:
+            col.metric(label, template.format(format_inr(values[key])))
+
+# Reruns the app once the background exact job is done
+@st.fragment(run_every="1s")
+def wait_for_exact(job):
+    if job.done():
+        st.rerun()
+    st.caption("⏳ Showing sample estimates, refining to exact values...")
+
+# Record explorer; paging, sorting and searching
+# rerun only this fragment, not the whole dashboard
+@st.fragment
+def explorer_view(data_key, filter_key, df):
+    st.subheader("📂 Record Explorer")
+    explorer_index = load_explorer_index(data_key, df)
+    col1, col2, col3, col4, col5 = st.columns([1.2, 1, 1.2, 2, 0.8])
+    sort_col = col1.selectbox("Sort by", explorer.SORT_COLUMNS)
+    sort_order = col2.selectbox("Order", ["Ascending", "Descending"])
+    search_col = col3.selectbox("Search in", explorer.SEARCH_COLUMNS)
+    query = col4.text_input("Search", placeholder="e.g. Station 12").strip()
+
+    positions = explorer_selection(
+        data_key, filter_key,
+        search_col, query, sort_col, df, explorer_index
+    )
+    n_pages = explorer.page_count(positions)
+    if st.session_state.get("explorer_page", 1) > n_pages:
+        st.session_state.explorer_page = n_pages
+    page = col5.number_input("Page", min_value=1, max_value=n_pages, key="explorer_page")
+
+    first_row = min((page - 1) * explorer.PAGE_SIZE + 1, len(positions))
+    last_row = min(page * explorer.PAGE_SIZE, len(positions))
+    st.caption(f"Showing {format_inr(first_row)}-{format_inr(last_row)} of {format_inr(len(positions))} records "
+               f"(page {format_inr(page)} of {format_inr(n_pages)})")
+    st.dataframe(explorer.get_page(df, positions, page, descending=(sort_order == "Descending")))
+
 # ---------------------------------------------------
 # Main Dashboard
 # ---------------------------------------------------
-if uploaded_file:
-    # Load and clean data
-    df = eda.load_and_clean_data(uploaded_file)
-    st.success("✅ Data Loaded and Cleaned!")
+if uploaded_file or dataset_dir:
+    import eda
+    import render
+    import approx
+    import sketch
+    import trends
+    import anomaly
+    import compare
+    import timeslots
+    import explorer
+    import quantiles
+    import partitions
+    import export
+
+    # Time slot settings (used when the file has raw tap timestamps)
+    with st.expander("⏱️ Time Slot Settings"):
+        st.caption(f"Applies to files with a raw `{eda.TIMESTAMP_COL}` column; pre-bucketed time slots are used as-is.")
+        slot_width = st.selectbox("Slot width (minutes)", timeslots.SLOT_WIDTHS, index=len(timeslots.SLOT_WIDTHS) - 1)
+        peak_text = st.text_input("Custom peak windows", placeholder="07:00-10:00, 17:00-20:00")
+        try:
+            peak_windows = tuple(timeslots.parse_windows(peak_text))
+        except ValueError:
+            st.error("Peak windows should look like 07:00-10:00, 17:00-20:00")
+            peak_windows = ()
+
+    # Load and clean an upload; a partitioned dataset only reads
+    # its summaries here and loads rows once the filters are known
+    if uploaded_file:
+        data_key = (uploaded_file.file_id, slot_width, peak_windows)
+        df = load_data(data_key, uploaded_file)
+        st.success("✅ Data Loaded and Cleaned!")
+        operators = []
+        years = sorted(df['Year'].unique())
+        routes = sorted(df['Route'].unique())
+        stations = sorted(df['Boarding Station'].unique())
+    else:
+        fingerprint = partitions.fingerprint(dataset_dir)
+        catalog = load_catalog(dataset_dir, fingerprint)
+        if not catalog:
+            st.warning(f"📌 No partitions found in `{dataset_dir}`. Add data with `python partitions.py data.csv {dataset_dir}`.")
+            st.stop()
+        operators, years, routes, stations = partitions.catalog_options(catalog)
 
     # ---------------------------------------------------
     # Filters
     # ---------------------------------------------------
-    years = sorted(df['Year'].unique())
+    selected_operators = []
+    if len(operators) > 1:
+        selected_operators = st.multiselect("🏢 **Select Operator(s)**", options=["All Operators"] + operators, default="All Operators")
+
     year_options = ["All Years"] + [str(y) for y in years]
     selected_years = st.multiselect("📅 **Select Year(s)**", options=year_options, default="All Years")
 
-    routes = sorted(df['Route'].unique())
     route_options = ["All Routes"] + [str(r) for r in routes]
     selected_routes = st.multiselect("🚌 **Select Route(s)**", options=route_options, default="All Routes")
 
-    stations = sorted(df['Boarding Station'].unique())
     station_options = ["All Stations"] + [str(s) for s in stations]
     selected_stations = st.multiselect("🚏 **Select Boarding Station(s)**", options=station_options, default="All Stations")
 
-    df_filtered = df.copy()
-
-    # Apply filters
-    if "All Years" not in selected_years and selected_years:
-        selected_years_int = [int(y) for y in selected_years]
-        df_filtered = df_filtered[df_filtered['Year'].isin(selected_years_int)]
-
-    if "All Routes" not in selected_routes and selected_routes:
-        df_filtered = df_filtered[df_filtered['Route'].isin(selected_routes)]
+    approx_mode = st.toggle(
+        "⚡ Approximate preview",
+        help="Show sample estimates with confidence intervals while exact values are computed in the background."
+    )
 
-    if "All Stations" not in selected_stations and selected_stations:
-        df_filtered = df_filtered[df_filtered['Boarding Station'].isin(selected_stations)]
+    filters = (
+        None if "All Years" in selected_years else selected_years,
+        None if "All Routes" in selected_routes else selected_routes,
+        None if "All Stations" in selected_stations else selected_stations
+    )
 
     # Filter info
     info_parts = []
+    if selected_operators and "All Operators" not in selected_operators:
+        info_parts.append(f"🏢 {', '.join(selected_operators)}")
     info_parts.append("📅 **All Years**" if "All Years" in selected_years or not selected_years else f"📅 {', '.join(selected_years)}")
     info_parts.append("🚌 **All Routes**" if "All Routes" in selected_routes or not selected_routes else f"🚌 {', '.join(selected_routes)}")
     info_parts.append("🚏 **All Stations**" if "All Stations" in selected_stations or not selected_stations else f"🚏 {', '.join(selected_stations)}")
     st.info(f"📌 Showing data for: {' | '.join(info_parts)}")
 
-    # ---------------------------------------------------
-    # Metrics
-    # ---------------------------------------------------
-    col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("👥 Total Passengers", f"{format_inr(eda.total_passengers(df_filtered))}")
-    col2.metric("📅 Avg Daily Passengers", f"{format_inr(int(eda.daily_ridership(df_filtered).mean()))}")
-    col3.metric("🚌 Total Routes", f"{format_inr(df_filtered['Route'].nunique())}")
-    col4.metric("🚏 Total Stations", f"{format_inr(df_filtered['Boarding Station'].nunique())}")
-    col5.metric("💰 Total Fare Collected", f"₹ {format_inr(eda.total_fare(df_filtered))}")
-
-    # ---------------------------------------------------
-    # Tabs
-    # ---------------------------------------------------
-    overview, routes_tab, stations_tab, trends_tab, fare_tab, doc_tab = st.tabs(
-        ["📊 Overview", "🚌 Routes", "🚏 Stations", "⏰ Trends", "💰 Fare", "📄 Documentation"]
-    )
-
-    with overview:
-        st.subheader("📂 Data Preview")
-        st.dataframe(df_filtered.head(100))
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            st.pyplot(plots.plot_weekday_vs_weekend(eda.weekday_vs_weekend(df_filtered)), use_container_width=True)
-        with col2:
-            st.pyplot(plots.plot_passengers_by_timeslot(eda.peak_time_slots(df_filtered)), use_container_width=True)
-        st.info(eda.generate_overview_insight(df_filtered))
-
-    with routes_tab:
-        with st.expander("📊 Route vs Peak Time Slot", expanded=True):
-            st.dataframe(format_dataframe_inr(eda.route_peak_timeslot(df_filtered)))
-        with st.expander("📊 Route: Weekday vs Weekend Usage", expanded=True):
-            st.dataframe(format_dataframe_inr(eda.route_weekday_weekend(df_filtered)))
-        st.pyplot(plots.plot_passengers_by_route(eda.top_routes(df_filtered)))
-        st.info(eda.generate_routes_insight(df_filtered))
-
-    with stations_tab:
-        with st.expander("🚏 Top 10 Boarding Stations", expanded=True):
-            busiest = eda.busiest_stations(df_filtered).reset_index().rename(columns={"index": "Boarding Station"})
-            st.dataframe(format_dataframe_inr(busiest.head(10)))
-        with st.expander("📊 Station vs Routes Table", expanded=True):
-            st.dataframe(format_dataframe_inr(eda.station_vs_routes(df_filtered)))
-        st.info(eda.generate_stations_insight(df_filtered))
-
-    with trends_tab:
-        st.subheader("⏰ Monthly Trends")
-        if not selected_years or "All Years" in selected_years:
-            last_3_years = sorted(df['Year'].unique())[-3:]
-            df_trend = df_filtered[df_filtered['Year'].isin(last_3_years)]
-            st.info(f"Showing monthly trends for: {', '.join(map(str, last_3_years))}")
-        else:
-            selected_years_int = [int(y) for y in selected_years]
-            df_trend = df_filtered[df_filtered['Year'].isin(selected_years_int)]
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            st.pyplot(plots.plot_monthly_trend(eda.monthly_passenger_trend(df_trend), 'Passenger Count', "Monthly Passenger Trend"), use_container_width=True)
-        with col2:
-            st.pyplot(plots.plot_monthly_trend(eda.monthly_fare_trend(df_trend), 'Fare Collected', "Monthly Fare Collection Trend"), use_container_width=True)
-        col3, col4 = st.columns([1, 1])
-        with col3:
-            st.pyplot(plots.plot_yearly_ridership(eda.yearly_ridership(df_filtered)), use_container_width=True)
-        with col4:
-            df_wday = eda.weekday_pattern(df_filtered)
-            st.pyplot(plots.plot_weekday_pattern(df_wday), use_container_width=True)
-        st.info(eda.generate_trends_insight(
-            eda.monthly_passenger_trend(df_trend),
-            eda.monthly_fare_trend(df_trend),
-            eda.yearly_ridership(df_filtered),
-            df_wday
-        ))
-
-    with fare_tab:
-        with st.expander("💰 Yearly Fare Collection", expanded=True):
-            st.dataframe(format_dataframe_inr(eda.yearly_fare(df_filtered)))
-        col1, col2 = st.columns([1, 1])
-        with col1:
-            st.pyplot(plots.plot_fare_by_route(eda.fare_by_route(df_filtered)), use_container_width=True)
-        with col2:
-            st.pyplot(plots.plot_fare_by_station(eda.fare_by_station(df_filtered)), use_container_width=True)
-        st.info(eda.generate_fare_insight(df_filtered))
-
-    with doc_tab:
-        show_documentation()
+    # Prune partitions by path and summary. Metrics the summaries
+    # answer are shown before any rows are read; the rest wait for
+    # the rows of the partitions left.
+    summary = {}
+    if uploaded_file:
+        metric_cols = None
+    else:
+        operator_filter = None if "All Operators" in selected_operators else selected_operators
+        selected_parts = partitions.prune(catalog, operator_filter, *filters)
+        if not selected_parts:
+            st.warning("📌 No partitions match the selected filters.")
+            st.stop()
+        st.success(f"✅ Reading {len(selected_parts)} of {len(catalog)} partitions")
+        metric_cols = st.columns(5)
+        summary = partitions.summary_totals(selected_parts, filters[1], filters[2]) or {}
+        show_metrics(metric_cols, summary)
+        data_key = ((dataset_dir, fingerprint, tuple(p['path'] for p in selected_parts)), slot_width, peak_windows)
+        df = load_partition_data(data_key, selected_parts)
+
+    filter_key = tuple(tuple(f) if f else None for f in filters)
+    exact_job = None
+    if approx_mode:
+        if st.session_state.get("exact_key") != (data_key, filter_key):
+            # Drop the superseded job, so quick filter changes don't
+            # queue full runs ahead of the current one
+            if "exact_job" in st.session_state:
+                approx.cancel_exact(st.session_state.exact_job)
+            st.session_state.exact_key = (data_key, filter_key)
+            st.session_state.exact_job = approx.submit_exact(exact_results, data_key, filter_key, df)
+        exact_job, _ = st.session_state.exact_job
+
+    if exact_job is not None and not exact_job.done():
+        show_approximate_preview(eda.filter_data(load_sample(data_key, df), *filters))
+        wait_for_exact(exact_job)
+    else:
+        exact = exact_job.result() if exact_job is not None else exact_results(data_key, filter_key, df)
+        df_filtered, charts = exact['df_filtered'], exact['charts']
+
+        # Distinct counts come from merged bitsets, not a rescan of the rows
+        distinct = distinct_counts(data_key, filter_key, load_distinct_indexes(data_key, df), df_filtered)
+
+        # ---------------------------------------------------
+        # Metrics
+        # ---------------------------------------------------
+        # Only the metrics the partition summaries did not answer
+        if metric_cols is None:
+            metric_cols = st.columns(5)
+        row_metrics = {
+            'passengers': exact['passengers'], 'avg_daily': exact['avg_daily'],
+            'routes': distinct['routes'], 'stations': distinct['stations'], 'fare': exact['fare']
+        }
+        show_metrics(metric_cols, {key: value for key, value in row_metrics.items() if summary.get(key) is None})
+
+        # ---------------------------------------------------
+        # Export
+        # Files are written chunk by chunk only when a
+        # download button is clicked.
+        # ---------------------------------------------------
+        with st.expander("⬇️ Export Data"):
+            col1, col2, col3 = st.columns([2, 1, 1])
+            export_tables = col1.multiselect(
+                "Tables", list(export.TABLES), default=["rows"], format_func=export.TABLE_LABELS.get
+            )
+            formats = export.available_formats()
+            export_format = col2.radio("Format", formats, horizontal=True)
+            export_formatted = col3.toggle("Indian number format", help="Write numbers as 12,34,567 text instead of raw values.")
+            if len(formats) < len(export.FORMATS):
+                st.caption("Install `pyarrow` for Parquet and `XlsxWriter` or `openpyxl` for Excel export.")
+
+            for table in export_tables:
+                st.download_button(
+                    f"⬇️ {export.TABLE_LABELS[table]} ({export_format})",
+                    data=partial(export.export_file, df_filtered, table, export_format, export_formatted),
+                    file_name=export.file_name(table, export_format),
+                    mime=export.FORMATS[export_format][1],
+                    on_click="ignore",
+                    key=f"export_{table}"
+                )
+
+        # ---------------------------------------------------
+        # Tabs
+        # ---------------------------------------------------
+        overview, routes_tab, stations_tab, trends_tab, fare_tab, compare_tab, anomalies_tab, doc_tab = st.tabs(
+            ["📊 Overview", "🚌 Routes", "🚏 Stations", "⏰ Trends", "💰 Fare", "🔀 Compare", "🚨 Anomalies", "📄 Documentation"]
+        )
+
+        with overview:
+            explorer_view(data_key, filter_key, df)
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.image(charts["weekday_vs_weekend"], width="stretch")
+            with col2:
+                st.image(charts["timeslot"], width="stretch")
+            st.info(exact['insights']['overview'])
+
+        with routes_tab:
+            with st.expander("📊 Route vs Peak Time Slot", expanded=True):
+                st.dataframe(format_dataframe_inr(exact['route_peak_timeslot']))
+            with st.expander("📊 Route: Weekday vs Weekend Usage", expanded=True):
+                st.dataframe(format_dataframe_inr(exact['route_weekday_weekend']))
+            st.image(charts["routes"])
+            st.info(exact['insights']['routes'])
+
+            st.subheader("📈 Passengers per Record: Percentiles")
+            st.caption("Merged from per-day sketches (within 1% of the exact value). Year and route filters apply; station filter does not.")
+            route_pct = quantiles.percentiles(quantiles.filter_sketches(
+                load_quantile_sketches(data_key, df), filters[0], filters[1]
+            ))
+            pct_name = st.selectbox("Percentile", list(quantiles.PERCENTILES), index=1)
+            heatmap = render.render_figures({
+                "pct_heatmap": ("plot_percentile_heatmap", (
+                    quantiles.percentile_pivot(route_pct, pct_name), f"{pct_name.upper()} Passengers per Record by Route and Time Slot"
+                ))
+            })
+            st.image(heatmap["pct_heatmap"], width="stretch")
+            with st.expander("📊 Route x Time Slot Percentiles"):
+                st.dataframe(route_pct)
+
+        with stations_tab:
+            with st.expander("🚏 Top 10 Boarding Stations", expanded=True):
+                st.dataframe(format_dataframe_inr(exact['busiest_stations'].head(10)))
+            with st.expander("📊 Station vs Routes Table", expanded=True):
+                st.dataframe(format_dataframe_inr(exact['station_vs_routes']))
+            st.info(distinct['stations_insight'])
+
+        with trends_tab:
+            st.subheader("⏰ Monthly Trends")
+            if not selected_years or "All Years" in selected_years:
+                st.info(f"Showing monthly trends for: {', '.join(map(str, exact['trend_years']))}")
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.image(charts["monthly_pass"], width="stretch")
+            with col2:
+                st.image(charts["monthly_fare"], width="stretch")
+            col3, col4 = st.columns([1, 1])
+            with col3:
+                st.image(charts["yearly"], width="stretch")
+            with col4:
+                st.image(charts["weekday"], width="stretch")
+            st.info(exact['insights']['trends'])
+
+            st.subheader("📈 Rolling Trends")
+            st.image(charts["rolling"], width="stretch")
+            col5, col6 = st.columns([1, 1])
+            with col5:
+                st.image(charts["wow_routes"], width="stretch")
+            with col6:
+                st.image(charts["wow_stations"], width="stretch")
+
+        with fare_tab:
+            with st.expander("💰 Yearly Fare Collection", expanded=True):
+                st.dataframe(format_dataframe_inr(exact['yearly_fare']))
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.image(charts["fare_route"], width="stretch")
+            with col2:
+                st.image(charts["fare_station"], width="stretch")
+            st.info(exact['insights']['fare'])
+
+        with compare_tab:
+            st.caption("Compare any two years or months. Route and station filters apply; the year filter does not.")
+            if uploaded_file:
+                period_choices = load_period_options(data_key, df)
+            else:
+                period_choices = partitions.period_options(catalog, operator_filter)
+            n_years = sum(len(p) == 4 for p in period_choices)
+            col1, col2 = st.columns(2)
+            period_a = col1.selectbox("📅 **Period A**", period_choices, index=max(n_years - 2, 0))
+            period_b = col2.selectbox("📅 **Period B**", period_choices, index=max(n_years - 1, 0))
+
+            # The loaded partitions are year-filtered, so a year filter
+            # means reading the two periods' partitions on their own
+            compare_key, compare_df = data_key, df
+            if not uploaded_file and filters[0]:
+                compare_parts = partitions.prune(
+                    catalog, operator_filter, [period_a[:4], period_b[:4]], filters[1], filters[2]
+                )
+                compare_key = ((dataset_dir, fingerprint, tuple(p['path'] for p in compare_parts)), slot_width, peak_windows)
+                compare_df = load_partition_data(compare_key, compare_parts) if compare_parts else None
+
+            if compare_df is None:
+                st.warning("📌 No partitions match the selected routes and stations in these periods.")
+            else:
+                # One aligned aggregate feeds every delta table
+                deltas, delta_charts, compare_insight = compare_periods(
+                    compare_key, filter_key[1], filter_key[2], period_a, period_b, compare_df
+                )
+
+                st.info(compare_insight)
+                for dim, icon in zip(compare.COMPARE_KEYS, ["🚌", "🚏", "⏰"]):
+                    with st.expander(f"{icon} {dim} Changes", expanded=(dim == 'Route')):
+                        col1, col2 = st.columns([1, 1])
+                        with col1:
+                            st.image(delta_charts[dim], width="stretch")
+                        with col2:
+                            st.dataframe(format_dataframe_inr(deltas[dim], exclude=['Δ Passengers %', 'Δ Fare %']))
+
+        with anomalies_tab:
+            st.caption("Each route/station, date and time slot is compared with its median on the same weekday and slot. "
+                       "Scores are robust z-scores; |score| ≥ 3.5 is flagged. Slots with a zero median or under "
+                       f"{anomaly.MIN_HISTORY} weeks of history are not scored.")
+            route_anomalies, station_anomalies = exact['route_anomalies'], exact['station_anomalies']
+            with st.expander("🚌 Route Anomalies", expanded=True):
+                st.dataframe(route_anomalies, hide_index=True)
+            st.info(eda.generate_anomaly_insight(route_anomalies))
+            with st.expander("🚏 Station Anomalies", expanded=True):
+                st.dataframe(station_anomalies, hide_index=True)
+            st.info(eda.generate_anomaly_insight(station_anomalies))
+
+        with doc_tab:
+            show_documentation()
 
 # ---------------------------------------------------
 # Footer
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+# --------------------------------------------
+# Approximate preview mode.
+# Aggregates are estimated from a stratified
+# sample (by Year/Route) with 95% confidence
+# intervals, while exact values are computed
+# in a background thread.
+# --------------------------------------------
+STRATA = ['Year', 'Route']
+Z_95 = 1.96
+
+_executor = ThreadPoolExecutor(max_workers=2)
+
+# --------------------------------------------
+# Draw a stratified random sample.
+# Each stratum keeps frac of its rows (at least
+# min_per_stratum), and every sampled row carries
+# its stratum id, stratum size (_N) and stratum
+# sample size (_n) for the estimators below.
+# --------------------------------------------
+def stratified_sample(df, frac=0.01, min_per_stratum=30, seed=42):
+    stratum = df.groupby(STRATA, sort=False, observed=True).ngroup()
+    pop = stratum.map(stratum.value_counts())
+    target = np.minimum(pop, np.maximum(min_per_stratum, np.ceil(pop * frac)))
+
+    rng = np.random.default_rng(seed)
+    order = pd.Series(rng.random(len(df)), index=df.index).groupby(stratum).rank(method='first')
+    keep = order <= target
+
+    sample = df[keep].copy()
+    sample['_stratum'] = stratum[keep]
+    sample['_N'] = pop[keep]
+    sample['_n'] = target[keep]
+    return sample
+
+# --------------------------------------------
+# Stratified estimate of a column total.
+# Rows filtered out of the sample count as zeros
+# in their stratum, so the estimate stays
+# unbiased for any Year/Route/Station filter.
+# Returns estimate and 95% CI half-width,
+# per group when `by` is given.
+# --------------------------------------------
+def estimate_total(sample, value_col, by=None):
+    y = sample[value_col].astype(float)
+    work = pd.DataFrame({
+        '_stratum': sample['_stratum'], 'y': y, 'y2': y * y,
+        '_N': sample['_N'], '_n': sample['_n']
+    })
+    keys = ['_stratum']
+    if by:
+        work[by] = sample[by]
+        keys.append(by)
+
+    g = work.groupby(keys, observed=True).agg(
+        s=('y', 'sum'), s2=('y2', 'sum'), N=('_N', 'first'), n=('_n', 'first')
+    )
+    mean = g['s'] / g['n']
+    var_h = ((g['s2'] - g['n'] * mean ** 2) / (g['n'] - 1).clip(lower=1)).clip(lower=0)
+    g['est'] = g['N'] * mean
+    g['var'] = g['N'] ** 2 * (1 - g['n'] / g['N']) * var_h / g['n']
+
+    if not by:
+        return g['est'].sum(), Z_95 * np.sqrt(g['var'].sum())
+
+    res = g.groupby(level=by)[['est', 'var']].sum()
+    out = pd.DataFrame({value_col: res['est'], 'CI ±': Z_95 * np.sqrt(res['var'])})
+    return out.sort_values(value_col, ascending=False)
+
+# --------------------------------------------
+# Approximate counterparts of the eda aggregates.
+# --------------------------------------------
+def total_passengers(sample):
+    return estimate_total(sample, 'Passenger Count')
+
+def total_fare(sample):
+    return estimate_total(sample, 'Fare')
+
+def top_routes(sample):
+    return estimate_total(sample, 'Passenger Count', by='Route')
+
+def busiest_stations(sample):
+    return estimate_total(sample, 'Passenger Count', by='Boarding Station')
+
+def peak_time_slots(sample):
+    return estimate_total(sample, 'Passenger Count', by='Time Slot')
+
+def weekday_vs_weekend(sample):
+    return estimate_total(sample, 'Passenger Count', by='Day Type')
+
+# --------------------------------------------
+# Run an exact computation in the background.
+# func gets a threading.Event as its last
+# argument, set by cancel_exact when the job is
+# superseded. Returns (Future, Event).
+# --------------------------------------------
+def submit_exact(func, *args):
+    stop = threading.Event()
+    return _executor.submit(func, *args, stop), stop
+
+# --------------------------------------------
+# Drop a superseded job: a queued job never
+# starts, a running one stops at its next
+# check_stop.
+# --------------------------------------------
+def cancel_exact(job):
+    future, stop = job
+    stop.set()
+    future.cancel()
+
+def check_stop(stop):
+    if stop is not None and stop.is_set():
+        raise CancelledError()
@@ -0,0 +1,71 @@
+# ---------------------------------------------------
+# STARTUP BENCHMARK
+# ---------------------------------------------------
+# Measures time-to-first-paint of the upload screen:
+# a full script run of app.py with no file uploaded,
+# each in a fresh Python process (as on a new pod).
+#
+# Usage: python pmpml_ridership/bench_startup.py [runs]
+# Set PMPML_ANIMATION=off to measure without Lottie.
+# ---------------------------------------------------
+
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "streamlit_lottie"]
+
+# Runs inside the fresh process
+CHILD_CODE = """
+import sys, json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.run()
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+print(json.dumps({
+    "streamlit_import": t1 - t0,
+    "first_paint": t2 - t1,
+    "rerun": t3 - t2,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": [m for m in sys.argv[2].split(",") if m in sys.modules]
+}))
+"""
+
+# ---------------------------------------------------
+# Run one cold start in a new interpreter.
+# ---------------------------------------------------
+def cold_start():
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE, APP_PATH, ",".join(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+# ---------------------------------------------------
+# Report median timings over several runs.
+# ---------------------------------------------------
+def main(runs=5):
+    results = [cold_start() for _ in range(runs)]
+
+    for key, label in [
+        ("streamlit_import", "Streamlit import"),
+        ("first_paint", "Time to first paint"),
+        ("rerun", "Warm rerun"),
+    ]:
+        values = [r[key] * 1000 for r in results]
+        print(f"{label:<22} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+
+    print(f"Heavy modules loaded:  {', '.join(results[-1]['loaded']) or 'none'}")
+    if results[-1]["errors"]:
+        print(f"App errors: {results[-1]['errors']}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
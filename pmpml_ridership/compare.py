@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------
+# Period-over-period comparison.
+# Two periods (a year "2024" or a month
+# "2024-03") are aggregated side by side in one
+# grouped pass, and deltas for routes, stations
+# and time slots are rolled up from it.
+# --------------------------------------------
+COMPARE_KEYS = ['Route', 'Boarding Station', 'Time Slot']
+
+VALUE_COLS = {'Passenger Count': 'Passengers', 'Fare': 'Fare'}
+
+# --------------------------------------------
+# Years and months available for comparison.
+# --------------------------------------------
+def period_options(df):
+    years = [str(int(y)) for y in sorted(df['Year'].dropna().unique())]
+    months = sorted(df['Date'].dropna().str[:7].unique())
+    return years + months
+
+# --------------------------------------------
+# Boolean mask of rows in a period.
+# --------------------------------------------
+def period_mask(df, period):
+    if len(period) == 4:
+        return (df['Year'] == int(period)).to_numpy()
+    return (df['Date'].str[:7] == period).to_numpy()
+
+# --------------------------------------------
+# Aligned aggregate of both periods by
+# (Route, Boarding Station, Time Slot). Each
+# value column is split into an A and a B column,
+# so one groupby covers both periods (and
+# overlapping periods are counted in both).
+# An optional row mask (e.g. route and station
+# filters) is applied without copying the frame.
+# --------------------------------------------
+def aligned_aggregate(df, period_a, period_b, mask=None):
+    in_a = period_mask(df, period_a)
+    in_b = period_mask(df, period_b)
+    rows = in_a | in_b
+    if mask is not None:
+        rows &= mask
+
+    work = df.loc[rows, COMPARE_KEYS].copy()
+    for col, label in VALUE_COLS.items():
+        values = df[col].to_numpy(dtype=float)[rows]
+        work[f'{label} A'] = np.where(in_a[rows], values, 0.0)
+        work[f'{label} B'] = np.where(in_b[rows], values, 0.0)
+
+    return work.groupby(COMPARE_KEYS, observed=True).sum()
+
+# --------------------------------------------
+# Delta table for one dimension, rolled up from
+# the aligned aggregate. Sorted by passenger
+# change, biggest gain first.
+# --------------------------------------------
+def delta_table(aligned, dim, period_a, period_b):
+    rolled = aligned.groupby(level=dim, observed=True).sum()
+
+    table = pd.DataFrame(index=rolled.index)
+    for label in VALUE_COLS.values():
+        a, b = rolled[f'{label} A'], rolled[f'{label} B']
+        table[f'{label} ({period_a})'] = a
+        table[f'{label} ({period_b})'] = b
+        table[f'Δ {label}'] = b - a
+        table[f'Δ {label} %'] = ((b - a) / a.where(a != 0) * 100).round(1)
+
+    return table.sort_values('Δ Passengers', ascending=False)
@@ -1,30 +1,79 @@
+import numpy as np
 import pandas as pd
 import utils
+import timeslots
+
+# Raw ticketing feeds have one row per tap with this column
+TIMESTAMP_COL = 'Timestamp'
 
 # --------------------------------------------
 # Load and prepare data from uploaded CSV.
-# Handles date parsing, fills missing values,
-# and derives helper columns for analysis.
 # --------------------------------------------
-def load_and_clean_data(uploaded_file):
+def load_and_clean_data(uploaded_file, slot_width=60, peak_windows=()):
     df = pd.read_csv(uploaded_file, encoding='utf-8-sig')
+    return clean_data(df, slot_width, peak_windows)
+
+# --------------------------------------------
+# Prepare a raw frame (whole file or one chunk).
+# Handles date parsing, fills missing values,
+# and derives helper columns for analysis.
+# Raw tap timestamps are binned into slots of
+# slot_width minutes (plus optional peak windows);
+# pre-bucketed slots are formatted as before.
+# --------------------------------------------
+def clean_data(df, slot_width=60, peak_windows=()):
+    if TIMESTAMP_COL in df.columns:
+        timestamps = pd.to_datetime(df[TIMESTAMP_COL], errors='coerce')
+        if 'Date' not in df.columns:
+            df['Date'] = timestamps
+        if 'Passenger Count' not in df.columns:
+            df['Passenger Count'] = 1
 
     df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
     df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
 
-    df['Year'] = pd.to_datetime(df['Date']).dt.year
-    df['Month'] = pd.to_datetime(df['Date']).dt.month_name()
+    dates = pd.to_datetime(df['Date'])
+    df['Year'] = dates.dt.year
+    df['Month'] = dates.dt.month_name()
 
     df['Passenger Count'] = df['Passenger Count'].fillna(0)
 
-    df['Day Type'] = pd.to_datetime(df['Date']).dt.dayofweek.apply(
-        lambda x: 'Weekend' if x >= 5 else 'Weekday'
-    )
+    df['Day Type'] = np.where(dates.dt.dayofweek >= 5, 'Weekend', 'Weekday')
 
-    df['Time Slot'] = df['Time Slot'].apply(utils.format_timeslot)
+    if TIMESTAMP_COL in df.columns:
+        edges = timeslots.build_edges(slot_width, peak_windows)
+        df['Time Slot'] = timeslots.bin_timestamps(timestamps, edges)
+    else:
+        df['Time Slot'] = timeslots.format_slots(df['Time Slot'])
 
     return df
 
+# --------------------------------------------
+# Boolean row mask for selected years, routes
+# and boarding stations. None or an empty list
+# means no filter on that column.
+# --------------------------------------------
+def filter_mask(df, years=None, routes=None, stations=None):
+    mask = np.ones(len(df), dtype=bool)
+
+    if years:
+        mask &= df['Year'].isin([int(y) for y in years]).to_numpy()
+
+    if routes:
+        mask &= df['Route'].isin(routes).to_numpy()
+
+    if stations:
+        mask &= df['Boarding Station'].isin(stations).to_numpy()
+
+    return mask
+
+# --------------------------------------------
+# Filter data by selected years, routes and
+# boarding stations.
+# --------------------------------------------
+def filter_data(df, years=None, routes=None, stations=None):
+    return df[filter_mask(df, years, routes, stations)].copy()
+
 # --------------------------------------------
 # Compute total number of passengers.
 # --------------------------------------------
@@ -120,22 +169,10 @@ def weekday_pattern(df):
 # Helps identify peak hours.
 # --------------------------------------------
 def peak_time_slots(df):
-    grouped = df.groupby("Time Slot")["Passenger Count"].sum().reset_index()
+    grouped = df.groupby("Time Slot", observed=True)["Passenger Count"].sum()
+    grouped = grouped.sort_index(key=lambda idx: idx.map(timeslots.label_start_minutes))
 
-    TIME_SLOT_ORDER = {
-        '5:00AM - 6:00AM': 1,  '6:00AM - 7:00AM': 2,  '7:00AM - 8:00AM': 3,
-        '8:00AM - 9:00AM': 4,  '9:00AM - 10:00AM': 5, '10:00AM - 11:00AM': 6,
-        '11:00AM - 12:00PM': 7,'12:00PM - 1:00PM': 8,'1:00PM - 2:00PM': 9,
-        '2:00PM - 3:00PM': 10, '3:00PM - 4:00PM': 11,'4:00PM - 5:00PM': 12,
-        '5:00PM - 6:00PM': 13, '6:00PM - 7:00PM': 14,'7:00PM - 8:00PM': 15,
-        '8:00PM - 9:00PM': 16, '9:00PM - 10:00PM': 17,'10:00PM - 11:00PM': 18
-    }
-
-    grouped['SlotOrder'] = grouped['Time Slot'].map(TIME_SLOT_ORDER)
-    grouped = grouped.dropna(subset=['SlotOrder'])
-    grouped = grouped.sort_values('SlotOrder')
-
-    return grouped.drop(columns=['SlotOrder']).iloc[::-1]
+    return grouped.reset_index().iloc[::-1]
 
 # --------------------------------------------
 # Aggregate passengers by route.
@@ -174,7 +211,7 @@ def fare_by_station(df):
 def route_peak_timeslot(df):
     return pd.pivot_table(
         df, index='Route', columns='Time Slot',
-        values='Passenger Count', aggfunc='sum'
+        values='Passenger Count', aggfunc='sum', observed=True
     ).fillna(0)
 
 # --------------------------------------------
@@ -220,7 +257,7 @@ def generate_overview_insight(df):
     peak_slots = []
 
     if 'Time Slot' in df.columns:
-        slot_counts = df.groupby('Time Slot')['Passenger Count'].sum().sort_values(ascending=False)
+        slot_counts = df.groupby('Time Slot', observed=True)['Passenger Count'].sum().sort_values(ascending=False)
         top_slots = slot_counts.head(2)
         peak_count = top_slots.sum()
         peak_slots = top_slots.index.tolist()
@@ -259,7 +296,7 @@ def generate_routes_insight(df):
     if 'Time Slot' in df.columns:
         top_route = top_routes.index[0]
         route_df = df[df['Route'] == top_route]
-        slot_counts = route_df.groupby('Time Slot')['Passenger Count'].sum().sort_values(ascending=False)
+        slot_counts = route_df.groupby('Time Slot', observed=True)['Passenger Count'].sum().sort_values(ascending=False)
         if not slot_counts.empty:
             peak_slot = slot_counts.index[0]
             insight += f"\n- For {top_route}, the busiest slot is {peak_slot}."
@@ -269,8 +306,10 @@ def generate_routes_insight(df):
 # --------------------------------------------
 # Generate insight for stations.
 # Highlights top stations and connected routes.
+# count_routes(station) can supply the distinct
+# route count, e.g. from merged sketches.
 # --------------------------------------------
-def generate_stations_insight(df):
+def generate_stations_insight(df, count_routes=None):
     if df.empty:
         return "No data available for stations insights."
 
@@ -287,7 +326,10 @@ def generate_stations_insight(df):
 
     if 'Route' in df.columns:
         top_station = top_stations.index[0]
-        routes = df[df['Boarding Station'] == top_station]['Route'].nunique()
+        if count_routes is not None:
+            routes = count_routes(top_station)
+        else:
+            routes = df[df['Boarding Station'] == top_station]['Route'].nunique()
         insight += f"\n- {top_station} connects to {routes} different routes."
 
     return insight
@@ -382,4 +424,59 @@ def generate_fare_insight(df):
         top_stations_pct = (top_stations.sum() / total_fare) * 100 if total_fare else 0
         insights.append(f"- Top stations ({', '.join(top_stations_list)}) handle ~{top_stations_pct:.1f}% of total fare.")
 
-    return "\n".join(insights) if insights else "No insights generated due to missing data."
\ No newline at end of file
+    return "\n".join(insights) if insights else "No insights generated due to missing data."
+
+# --------------------------------------------
+# Generate insight for ridership anomalies.
+# Takes a top_anomalies table.
+# --------------------------------------------
+def generate_anomaly_insight(df_anomalies):
+    if df_anomalies.empty:
+        return "No unusual ridership detected for the current selection."
+
+    group_col = df_anomalies.columns[0]
+    insights = [f"- The {len(df_anomalies)} most unusual cells deviate sharply from their usual weekday and time slot level."]
+
+    spikes = df_anomalies[df_anomalies['Score'] > 0]
+    if not spikes.empty:
+        top = spikes.loc[spikes['Score'].idxmax()]
+        insights.append(
+            f"- Biggest spike: {top[group_col]} on {top['Date']} ({top['Time Slot']}) "
+            f"with {utils.format_inr(top['Passengers'])} passengers vs ~{utils.format_inr(top['Expected'])} usual."
+        )
+
+    drops = df_anomalies[df_anomalies['Score'] < 0]
+    if not drops.empty:
+        top = drops.loc[drops['Score'].idxmin()]
+        insights.append(
+            f"- Biggest drop: {top[group_col]} on {top['Date']} ({top['Time Slot']}) "
+            f"with {utils.format_inr(top['Passengers'])} passengers vs ~{utils.format_inr(top['Expected'])} usual."
+        )
+
+    return "\n".join(insights)
+
+# --------------------------------------------
+# Generate insight for a period comparison.
+# Takes the route delta table from compare.py.
+# --------------------------------------------
+def generate_comparison_insight(df_route_delta, period_a, period_b):
+    if df_route_delta.empty:
+        return "No data available for the selected periods."
+
+    insights = []
+    for label, unit in [('Passengers', 'ridership'), ('Fare', 'fare collection')]:
+        total_a = df_route_delta[f'{label} ({period_a})'].sum()
+        total_b = df_route_delta[f'{label} ({period_b})'].sum()
+        if total_a:
+            change = ((total_b - total_a) / total_a) * 100
+            trend = "an increase" if change >= 0 else "a decrease"
+            insights.append(f"- {period_b} shows {trend} of ~{abs(change):.1f}% in {unit} compared to {period_a}.")
+
+    gainer = df_route_delta['Δ Passengers'].idxmax()
+    loser = df_route_delta['Δ Passengers'].idxmin()
+    if df_route_delta.loc[gainer, 'Δ Passengers'] > 0:
+        insights.append(f"- {gainer} gained the most passengers (+{utils.format_inr(df_route_delta.loc[gainer, 'Δ Passengers'])}).")
+    if df_route_delta.loc[loser, 'Δ Passengers'] < 0:
+        insights.append(f"- {loser} lost the most passengers ({utils.format_inr(df_route_delta.loc[loser, 'Δ Passengers'])}).")
+
+    return "\n".join(insights)
\ No newline at end of file
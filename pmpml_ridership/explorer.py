@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------
+# Paginated raw-record explorer.
+# Sort permutations and dictionary-encoded
+# search columns are built once per dataset.
+# A selection is kept as an array of row
+# positions, and only the rows of the requested
+# page are ever materialized.
+# --------------------------------------------
+PAGE_SIZE = 50
+
+SORT_COLUMNS = ['Date', 'Route', 'Boarding Station', 'Passenger Count', 'Fare']
+SEARCH_COLUMNS = ['Date', 'Route', 'Boarding Station', 'Time Slot']
+
+# --------------------------------------------
+# Stable ascending permutation of a column.
+# Values are replaced by their sorted dictionary
+# codes in the smallest integer type, so NumPy
+# can use its radix sort. Missing values go last.
+# --------------------------------------------
+def _sort_permutation(series):
+    codes, uniques = pd.factorize(series, sort=True)
+    codes = np.where(codes < 0, len(uniques), codes)
+    dtype = np.uint16 if len(uniques) < np.iinfo(np.uint16).max else np.uint32
+    return np.argsort(codes.astype(dtype), kind='stable')
+
+# --------------------------------------------
+# Build sort permutations and search indexes.
+# --------------------------------------------
+def build_explorer_index(df):
+    search = {}
+    for col in SEARCH_COLUMNS:
+        codes, values = pd.factorize(df[col])
+        search[col] = {'codes': codes, 'values': pd.Index(values.astype(str))}
+
+    return {
+        'rows': len(df),
+        'sort': {col: _sort_permutation(df[col]) for col in SORT_COLUMNS},
+        'search': search
+    }
+
+# --------------------------------------------
+# Rows whose column contains the query text
+# (case-insensitive). The match runs over the
+# distinct values only, then maps back to rows
+# through their codes.
+# --------------------------------------------
+def search_mask(index, column, query):
+    entry = index['search'][column]
+    matches = np.flatnonzero(entry['values'].str.contains(query, case=False, regex=False))
+    return np.isin(entry['codes'], matches)
+
+# --------------------------------------------
+# Positions of the selected rows (boolean mask
+# over the full frame) in sort_col order.
+# --------------------------------------------
+def sorted_selection(index, mask, sort_col):
+    perm = index['sort'][sort_col]
+    return perm[mask[perm]]
+
+def page_count(positions, page_size=PAGE_SIZE):
+    return max(1, -(-len(positions) // page_size))
+
+# --------------------------------------------
+# Rows of one page (1-based). Descending order
+# walks the ascending selection from the end.
+# --------------------------------------------
+def get_page(df, positions, page, page_size=PAGE_SIZE, descending=False):
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(positions))
+    if descending:
+        page_positions = positions[len(positions) - end:len(positions) - start][::-1]
+    else:
+        page_positions = positions[start:end]
+    return df.iloc[page_positions]
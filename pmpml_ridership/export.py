@@ -0,0 +1,209 @@
+import io
+import tempfile
+import importlib.util
+import numpy as np
+import pandas as pd
+import eda
+from utils import format_inr
+
+# --------------------------------------------
+# Bulk export of the current selection and the
+# dashboard pivot tables.
+# Rows are written CHUNK_ROWS at a time, so no
+# format ever holds more than one chunk of output
+# in memory. CSV is produced by a generator of
+# byte blocks; Parquet (pyarrow) and Excel
+# (XlsxWriter or openpyxl) are written to a temporary file and
+# streamed back from it in blocks.
+# --------------------------------------------
+CHUNK_ROWS = 100_000
+BLOCK_SIZE = 1 << 20
+
+# Excel sheets hold 1,048,576 rows including the header
+EXCEL_MAX_ROWS = 1_048_575
+
+# Labels, not quantities: never Indian-formatted
+FORMAT_EXCLUDE = ('Year', 'Month')
+
+# Export name -> aggregate builder (None: the rows themselves)
+TABLES = {
+    'rows': None,
+    'route_peak_timeslot': eda.route_peak_timeslot,
+    'route_weekday_weekend': eda.route_weekday_weekend,
+    'station_vs_routes': eda.station_vs_routes,
+    'yearly_fare': eda.yearly_fare
+}
+
+TABLE_LABELS = {
+    'rows': 'Filtered Rows',
+    'route_peak_timeslot': 'Route vs Peak Time Slot',
+    'route_weekday_weekend': 'Route: Weekday vs Weekend',
+    'station_vs_routes': 'Station vs Routes',
+    'yearly_fare': 'Yearly Fare Collection'
+}
+
+# Format -> (file extension, MIME type, required module(s))
+FORMATS = {
+    'CSV': ('csv', 'text/csv', None),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', 'pyarrow'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsxwriter|openpyxl')
+}
+
+# --------------------------------------------
+# Formats whose optional dependency is installed.
+# --------------------------------------------
+def available_formats():
+    return [
+        name for name, (_, _, module) in FORMATS.items()
+        if module is None or any(importlib.util.find_spec(m) is not None for m in module.split('|'))
+    ]
+
+def file_name(table, fmt):
+    return f"pmpml_{table}.{FORMATS[fmt][0]}"
+
+# --------------------------------------------
+# Row chunks of a table. Rows are sliced from the
+# frame by position (optionally through a boolean
+# mask) instead of copying the selection first;
+# aggregates are built once and are small.
+# --------------------------------------------
+def iter_chunks(df, table='rows', mask=None, chunk_rows=CHUNK_ROWS):
+    if TABLES[table] is not None:
+        if mask is not None:
+            df = df[mask]
+        aggregate = TABLES[table](df)
+        if aggregate.index.name is not None:
+            aggregate = aggregate.reset_index()
+        aggregate.columns = [str(c) for c in aggregate.columns]
+        yield aggregate
+        return
+
+    positions = np.flatnonzero(mask) if mask is not None else np.arange(len(df))
+    if not len(positions):
+        yield df.iloc[:0]
+    for start in range(0, len(positions), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows]]
+
+# --------------------------------------------
+# Indian-formatted copy of a chunk. Each distinct
+# number is formatted once, then mapped back to
+# the rows through its factorized code.
+# --------------------------------------------
+def format_chunk(chunk):
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        if col not in FORMAT_EXCLUDE and chunk[col].dtype in ['float64', 'int64']:
+            codes, uniques = pd.factorize(chunk[col])
+            labels = np.array([format_inr(v) for v in uniques] + [''], dtype=object)
+            chunk[col] = labels[codes]
+    return chunk
+
+def _prepare(chunks, formatted):
+    for chunk in chunks:
+        yield format_chunk(chunk) if formatted else chunk
+
+# --------------------------------------------
+# CSV as a generator of encoded blocks.
+# --------------------------------------------
+def iter_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+# --------------------------------------------
+# Parquet, one row group per chunk.
+# --------------------------------------------
+def write_parquet(chunks, f):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False, schema=writer.schema if writer else None)
+            if writer is None:
+                writer = pq.ParquetWriter(f, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+# --------------------------------------------
+# Excel writer: XlsxWriter in constant-memory
+# mode (the faster one) or openpyxl's write-only
+# mode. Both flush rows to disk as they go; long
+# tables continue on further sheets.
+# --------------------------------------------
+def _excel_engine():
+    for module in ('xlsxwriter', 'openpyxl'):
+        if importlib.util.find_spec(module) is not None:
+            return module
+    return None
+
+def _excel_rows(chunks):
+    for chunk in chunks:
+        frame = chunk.astype(object).where(chunk.notna(), None)
+        yield list(chunk.columns), frame.itertuples(index=False, name=None)
+
+def write_excel(chunks, f):
+    if _excel_engine() == 'xlsxwriter':
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(f, {'constant_memory': True})
+        new_sheet = workbook.add_worksheet
+        append = lambda sheet, n, row: sheet.write_row(n, 0, row)
+    else:
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        new_sheet = workbook.create_sheet
+        append = lambda sheet, n, row: sheet.append(row)
+
+    sheet, sheet_rows, sheets = None, EXCEL_MAX_ROWS, 0
+    for columns, rows in _excel_rows(chunks):
+        for row in rows:
+            if sheet_rows == EXCEL_MAX_ROWS:
+                sheets += 1
+                sheet = new_sheet(f"Sheet{sheets}")
+                append(sheet, 0, columns)
+                sheet_rows = 0
+            sheet_rows += 1
+            append(sheet, sheet_rows, row)
+    if sheet is None:
+        append(new_sheet("Sheet1"), 0, columns)
+
+    if _excel_engine() == 'xlsxwriter':
+        workbook.close()
+    else:
+        workbook.save(f)
+
+# --------------------------------------------
+# Export one table to an anonymous temporary
+# file and return it rewound (deleted on close),
+# as a read-only BufferedReader: the file type
+# st.download_button accepts from a callable.
+# --------------------------------------------
+def export_file(df, table='rows', fmt='CSV', formatted=False, mask=None):
+    chunks = _prepare(iter_chunks(df, table, mask), formatted)
+    out = tempfile.TemporaryFile()
+    if fmt == 'CSV':
+        for block in iter_csv(chunks):
+            out.write(block)
+    elif fmt == 'Parquet':
+        write_parquet(chunks, out)
+    else:
+        write_excel(chunks, out)
+    out.seek(0)
+    return io.BufferedReader(out.detach())
+
+# --------------------------------------------
+# Export as a generator of byte blocks. CSV is
+# streamed straight from the chunks; other
+# formats go through a temporary file.
+# --------------------------------------------
+def iter_export(df, table='rows', fmt='CSV', formatted=False, mask=None):
+    if fmt == 'CSV':
+        yield from iter_csv(_prepare(iter_chunks(df, table, mask), formatted))
+        return
+
+    with export_file(df, table, fmt, formatted, mask) as f:
+        yield from iter(lambda: f.read(BLOCK_SIZE), b'')
@@ -0,0 +1,99 @@
+# ---------------------------------------------------
+# LOAD TEST FOR THE JSON API
+# ---------------------------------------------------
+# Fires concurrent GET requests at a running api.py
+# and reports p50/p99 latency and requests/sec.
+#
+# Usage: python pmpml_ridership/loadtest.py --url http://127.0.0.1:8000
+# ---------------------------------------------------
+
+import json
+import time
+import random
+import argparse
+import statistics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+ENDPOINTS = [
+    '/top_routes',
+    '/peak_time_slots',
+    '/route_peak_timeslot',
+    '/monthly_passenger_trend',
+    '/insights'
+]
+
+# --------------------------------------------
+# Build a pool of request paths from the
+# endpoints and a few filter combinations.
+# --------------------------------------------
+def build_paths(years, routes, filter_mix):
+    filters = [''] + [f'?year={y}' for y in years] + [f'?route={quote(r)}' for r in routes]
+    filters = filters[:filter_mix]
+    return [endpoint + f for endpoint in ENDPOINTS for f in filters]
+
+# --------------------------------------------
+# Send one request; returns (status, seconds).
+# --------------------------------------------
+def fetch(url, etag=None):
+    request = Request(url, headers={'If-None-Match': etag} if etag else {})
+    start = time.perf_counter()
+    try:
+        with urlopen(request) as response:
+            response.read()
+            status = response.status
+    except HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - start
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the PMPML JSON API")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--filter-mix', type=int, default=5, help="Number of distinct filter combinations")
+    parser.add_argument('--conditional', action='store_true', help="Send If-None-Match with known ETags")
+    args = parser.parse_args()
+
+    with urlopen(args.url + '/route_peak_timeslot') as response:
+        routes = [row['Route'] for row in json.loads(response.read())][:5]
+    with urlopen(args.url + '/monthly_passenger_trend') as response:
+        years = sorted({row['Year'] for row in json.loads(response.read())})
+
+    paths = build_paths(years, routes, args.filter_mix)
+
+    # Warm-up pass fills the server cache and collects ETags
+    etags = {}
+    for path in paths:
+        with urlopen(args.url + path) as response:
+            etags[path] = response.headers.get('ETag')
+
+    random.seed(0)
+    jobs = [random.choice(paths) for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda path: fetch(args.url + path, etags[path] if args.conditional else None), jobs
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies = [seconds * 1000 for _, seconds in results]
+    statuses = Counter(status for status, _ in results)
+
+    print(f"Requests:     {len(results)} ({args.concurrency} concurrent, {len(paths)} distinct paths)")
+    print(f"Status codes: {dict(statuses)}")
+    print(f"p50 latency:  {percentile(latencies, 50):.2f} ms")
+    print(f"p99 latency:  {percentile(latencies, 99):.2f} ms")
+    print(f"Mean latency: {statistics.mean(latencies):.2f} ms")
+    print(f"Throughput:   {len(results) / elapsed:.1f} req/s")
+
+if __name__ == '__main__':
+    main()
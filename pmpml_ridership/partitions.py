@@ -0,0 +1,248 @@
+# ---------------------------------------------------
+# PARTITIONED RIDERSHIP DATASET
+# ---------------------------------------------------
+# Multi-operator history on local disk, one folder
+# per operator, year and month:
+#
+#   <root>/operator=PMPML/year=2024/month=03/data.csv
+#   <root>/operator=PMPML/year=2024/month=03/_summary.json
+#
+# Each partition keeps the raw rows plus a summary
+# (totals and per-route / per-station totals), so
+# selections prune partitions by path and summary
+# before any row data is read, and whole-partition
+# queries are answered from the summaries alone.
+#
+# Usage: python pmpml_ridership/partitions.py data.csv dataset/ --operator PMPML
+# ---------------------------------------------------
+
+import os
+import sys
+import json
+import argparse
+import pandas as pd
+
+import eda
+import timeslots
+
+DATA_FILE = 'data.csv'
+SUMMARY_FILE = '_summary.json'
+
+# --------------------------------------------
+# Partition folder for an operator/year/month.
+# --------------------------------------------
+def partition_dir(root, operator, year, month):
+    return os.path.join(root, f'operator={operator}', f'year={int(year)}', f'month={int(month):02d}')
+
+def _subdirs(path, prefix):
+    if not os.path.isdir(path):
+        return []
+    return sorted(
+        (entry.name[len(prefix):], entry.path) for entry in os.scandir(path)
+        if entry.is_dir() and entry.name.startswith(prefix)
+    )
+
+# --------------------------------------------
+# Summary of one partition's raw rows: rows,
+# passengers and fare overall and by route and
+# boarding station.
+# --------------------------------------------
+def summarize(rows):
+    work = pd.DataFrame({
+        'rows': 1,
+        'passengers': rows['Passenger Count'].fillna(0) if 'Passenger Count' in rows else 1,
+        'fare': rows['Fare'].fillna(0)
+    }, index=rows.index)
+
+    summary = {key: float(value) for key, value in work.sum().items()}
+    summary['rows'] = int(summary['rows'])
+    for dim, col in (('routes', 'Route'), ('stations', 'Boarding Station')):
+        totals = work.groupby(rows[col].astype(str).to_numpy()).sum()
+        summary[dim] = dict(zip(totals.index, totals.to_numpy().tolist()))
+    return summary
+
+# --------------------------------------------
+# Add one summary into another. Totals are sums,
+# so appended months merge without a rescan.
+# --------------------------------------------
+def merge_summary(a, b):
+    merged = {key: a[key] + b[key] for key in ('rows', 'passengers', 'fare')}
+    for dim in ('routes', 'stations'):
+        totals = {name: list(values) for name, values in a[dim].items()}
+        for name, values in b[dim].items():
+            totals[name] = [x + y for x, y in zip(totals.get(name, [0, 0, 0]), values)]
+        merged[dim] = totals
+    return merged
+
+# --------------------------------------------
+# Append raw CSV rows to the dataset in chunks.
+# Rows are written unchanged (cleaning happens
+# on load); ingesting the same file twice adds
+# its rows twice.
+# --------------------------------------------
+def ingest_csv(path, root, operator='PMPML', chunksize=500_000):
+    touched = set()
+    for chunk in pd.read_csv(path, encoding='utf-8-sig', chunksize=chunksize):
+        source = chunk['Date'] if 'Date' in chunk else chunk[eda.TIMESTAMP_COL]
+        dates = pd.to_datetime(source, errors='coerce')
+        chunk, dates = chunk[dates.notna()], dates[dates.notna()]
+
+        for (year, month), rows in chunk.groupby([dates.dt.year, dates.dt.month]):
+            folder = partition_dir(root, operator, year, month)
+            os.makedirs(folder, exist_ok=True)
+            summary = summarize(rows)
+
+            data_path = os.path.join(folder, DATA_FILE)
+            if os.path.exists(data_path):
+                header = pd.read_csv(data_path, nrows=0, encoding='utf-8-sig').columns
+                rows.reindex(columns=header).to_csv(data_path, mode='a', header=False, index=False)
+            else:
+                rows.to_csv(data_path, index=False)
+
+            summary_path = os.path.join(folder, SUMMARY_FILE)
+            if os.path.exists(summary_path):
+                with open(summary_path) as f:
+                    summary = merge_summary(json.load(f), summary)
+            with open(summary_path, 'w') as f:
+                json.dump(summary, f)
+            touched.add(folder)
+    return sorted(touched)
+
+# --------------------------------------------
+# Partition folders and their modified times,
+# from directory listings only. Used as the
+# cache key for the catalog.
+# --------------------------------------------
+def fingerprint(root):
+    stamps = []
+    for _, op_path in _subdirs(root, 'operator='):
+        for _, year_path in _subdirs(op_path, 'year='):
+            for _, month_path in _subdirs(year_path, 'month='):
+                summary_path = os.path.join(month_path, SUMMARY_FILE)
+                if os.path.exists(summary_path):
+                    stamps.append((month_path, os.path.getmtime(summary_path)))
+    return tuple(stamps)
+
+# --------------------------------------------
+# Catalog of partitions: path keys plus summary.
+# Summaries are small, so the whole history is
+# listed once per fingerprint; selections then
+# prune it in memory and only open the data
+# files they keep.
+# --------------------------------------------
+def load_catalog(root):
+    catalog = []
+    for operator, op_path in _subdirs(root, 'operator='):
+        for year, year_path in _subdirs(op_path, 'year='):
+            for month, month_path in _subdirs(year_path, 'month='):
+                summary_path = os.path.join(month_path, SUMMARY_FILE)
+                if not os.path.exists(summary_path):
+                    continue
+                with open(summary_path) as f:
+                    summary = json.load(f)
+                catalog.append({
+                    'operator': operator, 'year': int(year), 'month': int(month),
+                    'path': os.path.join(month_path, DATA_FILE), **summary
+                })
+    return catalog
+
+# --------------------------------------------
+# Operators, years, routes and stations present,
+# for the filter options.
+# --------------------------------------------
+def catalog_options(catalog):
+    return (
+        sorted({p['operator'] for p in catalog}),
+        sorted({p['year'] for p in catalog}),
+        sorted({r for p in catalog for r in p['routes']}),
+        sorted({s for p in catalog for s in p['stations']})
+    )
+
+# --------------------------------------------
+# Years and months held by the operators'
+# partitions, as compare.period_options gives
+# them for loaded rows.
+# --------------------------------------------
+def period_options(catalog, operators=None):
+    parts = prune(catalog, operators)
+    years = sorted({p['year'] for p in parts})
+    months = sorted({f"{p['year']}-{p['month']:02d}" for p in parts})
+    return [str(y) for y in years] + months
+
+# --------------------------------------------
+# Partitions that can hold rows for the selection.
+# None or an empty list means no filter.
+# --------------------------------------------
+def prune(catalog, operators=None, years=None, routes=None, stations=None):
+    years = [int(y) for y in years] if years else None
+    return [
+        p for p in catalog
+        if (not operators or p['operator'] in operators)
+        and (not years or p['year'] in years)
+        and (not routes or any(r in p['routes'] for r in routes))
+        and (not stations or any(s in p['stations'] for s in stations))
+    ]
+
+# --------------------------------------------
+# Rows, passengers, fare and distinct routes and
+# stations for the selection, from summaries
+# only. Totals are answerable unless both routes
+# and stations are filtered (their combination
+# is not summarized); returns None then. With
+# one of them filtered, the other's distinct
+# count is None.
+# --------------------------------------------
+def summary_totals(partitions, routes=None, stations=None):
+    if routes and stations:
+        return None
+
+    totals = {'rows': 0, 'passengers': 0.0, 'fare': 0.0}
+    dim, names = ('routes', routes) if routes else ('stations', stations)
+    for p in partitions:
+        if names:
+            for name in names:
+                rows, passengers, fare = p[dim].get(name, (0, 0, 0))
+                totals['rows'] += rows
+                totals['passengers'] += passengers
+                totals['fare'] += fare
+        else:
+            for key in totals:
+                totals[key] += p[key]
+    totals['rows'] = int(totals['rows'])
+
+    for key, selected, other in (('routes', routes, stations), ('stations', stations, routes)):
+        present = {name for p in partitions for name in p[key]}
+        totals[key] = None if other else len(present & set(selected) if selected else present)
+    return totals
+
+# --------------------------------------------
+# Read and clean the rows of the given partitions.
+# Only their data files are opened. Each partition
+# is cleaned on its own, since operators may ship
+# pre-bucketed slots or raw tap timestamps; the
+# slot categories are then merged in time order.
+# --------------------------------------------
+def load_partitions(partitions, slot_width=60, peak_windows=()):
+    frames = [
+        eda.clean_data(pd.read_csv(p['path'], encoding='utf-8-sig'), slot_width, peak_windows)
+        .assign(Operator=p['operator'])
+        for p in partitions
+    ]
+    slots = timeslots.sort_labels({s for f in frames for s in f['Time Slot'].cat.categories})
+    df = pd.concat(frames, ignore_index=True)
+    df['Time Slot'] = pd.Categorical(df['Time Slot'], categories=slots, ordered=True)
+    return df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add a ridership CSV to a partitioned dataset")
+    parser.add_argument('csv', help="Path to the ridership CSV file")
+    parser.add_argument('root', help="Dataset folder")
+    parser.add_argument('--operator', default='PMPML')
+    parser.add_argument('--chunksize', type=int, default=500_000)
+    args = parser.parse_args(argv)
+
+    touched = ingest_csv(args.csv, args.root, args.operator, args.chunksize)
+    print(f"Wrote {len(touched)} partition(s) for {args.operator} under {args.root}")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,3 +1,4 @@
+import math
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 from utils import *
@@ -45,14 +46,34 @@ def plot_weekday_vs_weekend(data):
     fig.tight_layout()
     return fig
 
+# Time slot chart: inches per slot bar, capped
+# total height, and the spacing a tick or value
+# label needs (finer slots thin the ticks and
+# drop the value labels)
+SLOT_BAR_INCHES = 1 / 3
+MAX_TIMESLOT_HEIGHT = 16
+MIN_LABEL_INCHES = 0.25
+
 # --------------------------------------------
 # Horizontal bar chart: Passengers by Time Slot.
-# Shows peak hours.
+# Shows peak hours. The height grows with the
+# number of slots, so any slot width fits.
 # --------------------------------------------
 def plot_passengers_by_timeslot(data):
-    fig, ax = plt.subplots(figsize=(7, 8))
+    n_slots = len(data)
+    height = min(max(4, n_slots * SLOT_BAR_INCHES), MAX_TIMESLOT_HEIGHT)
+    fig, ax = plt.subplots(figsize=(7, height))
+
+    positions = list(range(n_slots))
+    ax.barh(positions, data['Passenger Count'])
 
-    ax.barh(data['Time Slot'].astype('str'), data['Passenger Count'])
+    # Ticks counted from the top (earliest) slot
+    step = max(1, math.ceil(MIN_LABEL_INCHES * n_slots / height))
+    ticks = positions[::-1][::step]
+    labels = data['Time Slot'].astype('str').tolist()
+    ax.set_yticks(ticks, [labels[i] for i in ticks])
+    if n_slots:
+        ax.set_ylim(-0.5, n_slots - 0.5)
 
     ax.set_title("Passengers by Time Slot")
     ax.set_xlabel("Passengers")
@@ -61,17 +82,18 @@ def plot_passengers_by_timeslot(data):
 
     ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: format_inr(x)))
 
-    for i, v in enumerate(data['Passenger Count']):
-        ax.text(
-            v - (0.01 * max(data['Passenger Count'])),
-            i,
-            format_inr(v),
-            va='center',
-            ha='right',
-            color='black',
-            fontsize=8,
-            fontweight='bold'
-        )
+    if height / max(n_slots, 1) >= MIN_LABEL_INCHES:
+        for i, v in enumerate(data['Passenger Count']):
+            ax.text(
+                v - (0.01 * max(data['Passenger Count'])),
+                i,
+                format_inr(v),
+                va='center',
+                ha='right',
+                color='black',
+                fontsize=8,
+                fontweight='bold'
+            )
 
     fig.tight_layout()
     return fig
@@ -248,5 +270,102 @@ def plot_fare_by_station(df_station):
             fontweight='bold'
         )
 
+    fig.tight_layout()
+    return fig
+
+# --------------------------------------------
+# Line chart: Daily ridership with 7/28-day
+# moving averages and seasonal baseline.
+# --------------------------------------------
+def plot_rolling_trend(df_roll, title):
+    fig, ax = plt.subplots(figsize=(12, 5))
+
+    ax.plot(df_roll['Date'], df_roll['Daily'], color="#555555", linewidth=0.8, label="Daily")
+    ax.plot(df_roll['Date'], df_roll['7-Day Avg'], linewidth=2, label="7-Day Avg")
+    ax.plot(df_roll['Date'], df_roll['28-Day Avg'], linewidth=2, label="28-Day Avg")
+    ax.plot(df_roll['Date'], df_roll['Baseline'], color="#CCCCCC", linestyle='--', linewidth=1, alpha=0.7, label="Seasonal Baseline")
+
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Passengers")
+    ax.yaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: format_inr(x)))
+    ax.grid(axis='y', linestyle='--', alpha=0.5)
+    ax.legend(loc='upper left')
+
+    fig.autofmt_xdate(rotation=45)
+    fig.tight_layout()
+    return fig
+
+# --------------------------------------------
+# Diverging bar chart: Week-over-week change
+# for the biggest movers.
+# --------------------------------------------
+def plot_wow_change(df_wow, label_col, title):
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    values = df_wow['WoW Change %']
+    colors = [DARK_PALETTE[1] if v >= 0 else DARK_PALETTE[2] for v in values]
+    ax.barh(df_wow[label_col].astype(str), values, color=colors)
+    ax.axvline(0, color="#888888", linewidth=1)
+    ax.margins(x=0.15)
+
+    ax.set_title(title)
+    ax.set_xlabel("Change vs Previous Week (%)")
+    ax.set_ylabel(label_col)
+
+    for i, v in enumerate(values):
+        ax.text(v, i, f" {v:+.1f}% ", va='center', ha='left' if v >= 0 else 'right', fontsize=8, fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+# --------------------------------------------
+# Diverging bar chart: Period-over-period change
+# for the routes/stations/slots that moved most.
+# --------------------------------------------
+def plot_period_delta(df_delta, label_col, title, n=10):
+    fig, ax = plt.subplots(figsize=(8, 5))
+
+    df_delta = df_delta.reset_index()
+    top = df_delta['Δ Passengers'].abs().sort_values(ascending=False).index[:n]
+    df_delta = df_delta.loc[top].sort_values('Δ Passengers')
+
+    values = df_delta['Δ Passengers']
+    colors = [DARK_PALETTE[1] if v >= 0 else DARK_PALETTE[2] for v in values]
+    ax.barh(df_delta[label_col].astype(str), values, color=colors)
+    ax.axvline(0, color="#888888", linewidth=1)
+    ax.margins(x=0.15)
+
+    ax.set_title(title)
+    ax.set_xlabel("Change in Passengers")
+    ax.set_ylabel(label_col)
+    ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: format_inr(x)))
+
+    for i, v in enumerate(values):
+        ax.text(v, i, f" {'+' if v >= 0 else ''}{format_inr(v)} ", va='center', ha='left' if v >= 0 else 'right', fontsize=8, fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+# --------------------------------------------
+# Heatmap: Passenger Count percentile per record
+# by route and time slot.
+# --------------------------------------------
+def plot_percentile_heatmap(pivot, title):
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    im = ax.imshow(pivot.to_numpy(dtype=float), aspect='auto', cmap='viridis')
+    ax.set_xticks(range(len(pivot.columns)))
+    ax.set_xticklabels(pivot.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(pivot.index)))
+    ax.set_yticklabels(pivot.index)
+
+    ax.set_title(title)
+    ax.set_xlabel("Time Slot")
+    ax.set_ylabel("Route")
+
+    cbar = fig.colorbar(im, ax=ax)
+    cbar.set_label("Passengers per Record")
+
     fig.tight_layout()
     return fig
\ No newline at end of file
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import eda
+import timeslots
+
+# --------------------------------------------
+# Mergeable percentile sketches.
+# Per-record Passenger Count is summarized per
+# (Route, Time Slot, Date) partition as counts in
+# log-spaced buckets (DDSketch). Any quantile read
+# from a bucket is within ALPHA relative error.
+# Below ~50 a bucket spans at most one integer, so
+# counts there are reported as that integer and are
+# exact. Sketches merge by adding counts, so
+# chunked and incremental loads combine freely.
+# --------------------------------------------
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+
+PARTITION_KEYS = ['Route', 'Time Slot', 'Date']
+
+PERCENTILES = {'p50': 0.50, 'p90': 0.90, 'p99': 0.99}
+
+# Bucket for values <= 0 (sorts before all others)
+ZERO_BUCKET = -(1 << 15)
+
+# --------------------------------------------
+# Bucket index of each value, and the value a
+# bucket represents: the only integer in the
+# bucket if it holds exactly one, else the value
+# within ALPHA of every point in it.
+# --------------------------------------------
+def bucket_index(values):
+    values = np.asarray(values, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        buckets = np.ceil(np.log(values) / np.log(GAMMA))
+    return np.where(values > 0, buckets, ZERO_BUCKET).astype(np.int32)
+
+def bucket_value(buckets):
+    buckets = np.asarray(buckets)
+    upper = GAMMA ** buckets.astype(float)
+    lower = upper / GAMMA
+    single = np.floor(upper) - np.floor(lower) == 1
+    value = np.where(single, np.floor(upper), 2 * upper / (GAMMA + 1))
+    return np.where(buckets == ZERO_BUCKET, 0.0, value)
+
+# --------------------------------------------
+# Sketch table for a cleaned frame: one row per
+# (partition, bucket) with its record count.
+# --------------------------------------------
+def build_sketches(df, value_col='Passenger Count'):
+    work = df[PARTITION_KEYS].copy()
+    for col in PARTITION_KEYS:
+        work[col] = work[col].astype(str)
+    work['Bucket'] = bucket_index(df[value_col])
+    return work.groupby(PARTITION_KEYS + ['Bucket']).size().rename('Count').reset_index()
+
+# --------------------------------------------
+# Merge sketch tables (chunks, partitions or an
+# incremental load on top of an existing table).
+# --------------------------------------------
+def merge_sketches(*tables):
+    merged = pd.concat(tables, ignore_index=True)
+    return merged.groupby(PARTITION_KEYS + ['Bucket'], as_index=False)['Count'].sum()
+
+# --------------------------------------------
+# Build sketches for a CSV in chunks, so the
+# whole file never has to be in memory.
+# --------------------------------------------
+def build_sketches_chunked(path, chunksize=1_000_000, slot_width=60, peak_windows=()):
+    tables = [
+        build_sketches(eda.clean_data(chunk, slot_width, peak_windows))
+        for chunk in pd.read_csv(path, encoding='utf-8-sig', chunksize=chunksize)
+    ]
+    return merge_sketches(*tables)
+
+# --------------------------------------------
+# Partitions matching year and route filters.
+# --------------------------------------------
+def filter_sketches(table, years=None, routes=None):
+    mask = np.ones(len(table), dtype=bool)
+    if years:
+        mask &= table['Date'].str[:4].isin([str(y) for y in years]).to_numpy()
+    if routes:
+        mask &= table['Route'].isin(routes).to_numpy()
+    return table[mask]
+
+# --------------------------------------------
+# Percentiles of Passenger Count per `by` group,
+# computed by merging the partitions' buckets
+# and walking their cumulative counts.
+# --------------------------------------------
+def percentiles(table, by=('Route', 'Time Slot')):
+    by = list(by)
+    rolled = table.groupby(by + ['Bucket'])['Count'].sum().reset_index()
+    cum = rolled.groupby(by)['Count'].cumsum()
+    total = rolled.groupby(by)['Count'].transform('sum')
+
+    result = rolled.groupby(by)['Count'].sum().rename('Records').to_frame()
+    for name, q in PERCENTILES.items():
+        hit = rolled[cum > q * (total - 1)].groupby(by).head(1).set_index(by)['Bucket']
+        result[name] = bucket_value(hit.reindex(result.index)).round(1)
+    return result
+
+# --------------------------------------------
+# Route x Time Slot grid of one percentile for
+# the n busiest routes, slots in time order.
+# --------------------------------------------
+def percentile_pivot(result, name='p90', n=15):
+    busiest = result['Records'].groupby(level='Route').sum().nlargest(n).index
+    pivot = result[name].unstack('Time Slot').reindex(busiest)
+    return pivot[timeslots.sort_labels(pivot.columns)]
@@ -0,0 +1,103 @@
+import io
+import os
+import sys
+import types
+import atexit
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import CancelledError
+
+# --------------------------------------------
+# Parallel figure rendering service.
+# Each worker process draws with the Agg backend
+# and the dark theme from plots.py, and returns
+# the encoded image bytes.
+# --------------------------------------------
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Same defaults st.pyplot uses when saving a figure
+SAVEFIG_KWARGS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# --------------------------------------------
+# Worker setup: select Agg before pyplot loads,
+# then import plots so the theme is applied once.
+# --------------------------------------------
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    import plots  # noqa: F401
+
+# --------------------------------------------
+# Draw one figure and encode it.
+# --------------------------------------------
+def _render_one(plot_name, args):
+    import matplotlib.pyplot as plt
+    import plots
+
+    fig = getattr(plots, plot_name)(*args)
+    buf = io.BytesIO()
+    fig.savefig(buf, **SAVEFIG_KWARGS)
+    plt.close(fig)
+    return buf.getvalue()
+
+# --------------------------------------------
+# Spawned children re-run the parent's __main__
+# module, which under Streamlit is the page script.
+# While workers start, __main__ is swapped for an
+# empty module so they only import render/plots.
+# --------------------------------------------
+@contextmanager
+def _bare_main():
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+# --------------------------------------------
+# Shared process pool, created once per process
+# (under a lock, as script runs and background
+# jobs call this from several threads) and reused
+# across Streamlit reruns. All workers are started
+# up front, inside _bare_main, and terminated at
+# interpreter exit.
+# --------------------------------------------
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            with _bare_main():
+                _pool = multiprocessing.get_context("spawn").Pool(
+                    processes=MAX_WORKERS,
+                    initializer=_init_worker
+                )
+            atexit.register(_pool.terminate)
+    return _pool
+
+# --------------------------------------------
+# Render independent figures in parallel.
+# jobs: {key: (plot function name, args tuple)}
+# At most MAX_WORKERS figures per call are in
+# flight; once `stop` (a threading.Event) is
+# set, no more are dispatched and the call
+# raises CancelledError.
+# Returns {key: PNG bytes}.
+# --------------------------------------------
+def render_figures(jobs, stop=None):
+    pool = get_pool()
+    queue = list(jobs.items())[::-1]
+    running, images = {}, {}
+    while queue or running:
+        while queue and len(running) < MAX_WORKERS:
+            if stop is not None and stop.is_set():
+                raise CancelledError()
+            key, (plot_name, args) = queue.pop()
+            running[key] = pool.apply_async(_render_one, (plot_name, tuple(args)))
+        key = next(iter(running))
+        images[key] = running.pop(key).get()
+    return images
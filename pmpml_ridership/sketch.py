@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------
+# Mergeable distinct-count bitsets.
+# The values of the counted column form a shared
+# dictionary, and each partition keeps a bitset
+# over it (one bit per value, packed 8 to a
+# byte). Distinct counts for any selection of
+# partitions are exact: their bitsets are OR-ed
+# and the set bits counted, instead of
+# rescanning rows.
+# --------------------------------------------
+
+# --------------------------------------------
+# Set the bits of (partition, value code) pairs
+# in a packed bitset array, in place.
+# --------------------------------------------
+def _set_bits(bits, pid, codes):
+    np.bitwise_or.at(bits, (pid, codes >> 3), np.left_shift(1, codes & 7).astype(np.uint8))
+    return bits
+
+def _empty_bits(n_partitions, n_values):
+    return np.zeros((n_partitions, (n_values + 7) // 8), dtype=np.uint8)
+
+# --------------------------------------------
+# (partition, value code) pairs of set bits.
+# --------------------------------------------
+def _pairs(index):
+    unpacked = np.unpackbits(index['bits'], axis=1, count=len(index['values']), bitorder='little')
+    return np.nonzero(unpacked)
+
+# --------------------------------------------
+# Build a distinct-count index over value_col,
+# with one bitset per partition_cols group.
+# E.g. (Date, Route) -> distinct stations.
+# Extra key columns that depend on the partition
+# (like Year for Date) can be listed for filtering.
+# --------------------------------------------
+def build_distinct_index(df, partition_cols, value_col):
+    grouped = df.groupby(partition_cols, sort=False, observed=True)
+    keys = grouped.size().reset_index()[partition_cols]
+
+    # Rows with a missing key (NaN group number) or value are not
+    # counted, as in nunique()
+    pid = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    codes, values = pd.factorize(df[value_col].to_numpy(), sort=True)
+    valid = (pid >= 0) & (codes >= 0)
+
+    return {
+        'keys': keys,
+        'value_col': value_col,
+        'values': np.asarray(values),
+        'bits': _set_bits(_empty_bits(len(keys), len(values)), pid[valid], codes[valid])
+    }
+
+# --------------------------------------------
+# Merge two indexes built on the same columns,
+# e.g. from two chunks of a file or an
+# incremental load. Bits are re-coded into the
+# union of both dictionaries; shared partitions
+# are OR-ed.
+# --------------------------------------------
+def merge_indexes(a, b):
+    cols = list(a['keys'].columns)
+    keys = pd.concat([a['keys'], b['keys']], ignore_index=True)
+    new_pid = keys.groupby(cols, sort=False, observed=True).ngroup().to_numpy()
+    offset = len(a['keys'])
+
+    # Groups are numbered in order of first appearance
+    merged_keys = keys.drop_duplicates(subset=cols).reset_index(drop=True)
+    values = np.union1d(a['values'], b['values'])
+    bits = _empty_bits(len(merged_keys), len(values))
+    for index, start in ((a, 0), (b, offset)):
+        pid, codes = _pairs(index)
+        _set_bits(bits, new_pid[pid + start], np.searchsorted(values, index['values'])[codes])
+
+    return {'keys': merged_keys, 'value_col': a['value_col'], 'values': values, 'bits': bits}
+
+# --------------------------------------------
+# Count distinct values over the partitions that
+# match key_filters ({column: allowed values}).
+# `values` restricts the counted column itself.
+# --------------------------------------------
+def count_distinct(index, key_filters=None, values=None):
+    keys = index['keys']
+    selected = np.ones(len(keys), dtype=bool)
+    for col, allowed in (key_filters or {}).items():
+        if allowed:
+            selected &= keys[col].isin(allowed).to_numpy()
+
+    merged = np.bitwise_or.reduce(index['bits'][selected], axis=0)
+    if values:
+        merged &= np.packbits(np.isin(index['values'], list(values)), bitorder='little')
+    return int(np.unpackbits(merged).sum())
@@ -0,0 +1,105 @@
+import re
+import numpy as np
+import pandas as pd
+import utils
+
+# --------------------------------------------
+# Time slot binning engine.
+# Raw tap timestamps are binned into slots of a
+# configurable width (plus optional custom peak
+# windows) with a vectorized searchsorted, and
+# slots become an ordered Categorical so every
+# slot-based view sorts by time at any granularity.
+# --------------------------------------------
+SLOT_WIDTHS = [15, 30, 60]
+
+DAY_START = 0
+DAY_END = 24 * 60
+
+_WINDOW = re.compile(r'^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$')
+_LABEL_START = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*(AM|PM)', re.IGNORECASE)
+
+# --------------------------------------------
+# Format minutes since midnight as 'H:MMAM/PM'.
+# --------------------------------------------
+def format_minutes(minutes):
+    hour, minute = divmod(int(minutes) % DAY_END, 60)
+    period = "AM" if hour < 12 else "PM"
+    hour = hour % 12 or 12
+    return f"{hour}:{minute:02d}{period}"
+
+# --------------------------------------------
+# Parse custom peak windows, e.g.
+# "07:00-10:00, 17:00-20:00" -> [(420, 600), (1020, 1200)]
+# --------------------------------------------
+def parse_windows(text):
+    windows = []
+    for part in filter(None, (p.strip() for p in (text or '').split(','))):
+        match = _WINDOW.match(part)
+        if not match:
+            raise ValueError(f"Invalid peak window: {part}")
+        start_h, start_m, end_h, end_m = (int(g) for g in match.groups())
+        if start_m > 59 or end_m > 59:
+            raise ValueError(f"Invalid peak window: {part}")
+        windows.append((start_h * 60 + start_m, end_h * 60 + end_m))
+        if not DAY_START <= windows[-1][0] < windows[-1][1] <= DAY_END:
+            raise ValueError(f"Invalid peak window: {part}")
+    return sorted(windows)
+
+# --------------------------------------------
+# Slot edges in minutes: a regular grid of
+# `width` minutes, where each peak window
+# replaces the grid edges inside it.
+# --------------------------------------------
+def build_edges(width=60, peak_windows=(), start=DAY_START, end=DAY_END):
+    edges = np.arange(start, end + 1, width)
+    for w_start, w_end in peak_windows:
+        edges = edges[(edges <= w_start) | (edges >= w_end)]
+    bounds = [t for window in peak_windows for t in window]
+    return np.unique(np.concatenate([edges, bounds, [start, end]]).astype(int))
+
+# --------------------------------------------
+# Labels for the slots between edges.
+# --------------------------------------------
+def slot_labels(edges):
+    return [f"{format_minutes(a)} - {format_minutes(b)}" for a, b in zip(edges[:-1], edges[1:])]
+
+# --------------------------------------------
+# Bin timestamps into slots. Returns an ordered
+# Categorical; times outside the edges are NaN.
+# --------------------------------------------
+def bin_timestamps(timestamps, edges):
+    ts = pd.to_datetime(timestamps, errors='coerce')
+    minutes = (ts.dt.hour * 60 + ts.dt.minute + ts.dt.second / 60).to_numpy(dtype=float)
+
+    codes = np.searchsorted(edges, minutes, side='right') - 1
+    codes[(codes < 0) | (codes >= len(edges) - 1) | np.isnan(minutes)] = -1
+    return pd.Categorical.from_codes(codes, categories=slot_labels(edges), ordered=True)
+
+# --------------------------------------------
+# Start of a slot label in minutes, for sorting.
+# Unparseable labels sort last.
+# --------------------------------------------
+def label_start_minutes(label):
+    match = _LABEL_START.match(str(label))
+    if not match:
+        return DAY_END
+    hour, minute, period = int(match.group(1)), int(match.group(2)), match.group(3).upper()
+    return (hour % 12 + (12 if period == "PM" else 0)) * 60 + minute
+
+def sort_labels(labels):
+    return sorted(labels, key=label_start_minutes)
+
+# --------------------------------------------
+# Pre-bucketed 'H:00-H:00' slot strings: format
+# each distinct value once and return an ordered
+# Categorical.
+# --------------------------------------------
+def format_slots(slots):
+    codes, uniques = pd.factorize(slots)
+    labels = [utils.format_timeslot(s) for s in uniques]
+    categories = sort_labels(set(labels))
+    if labels:
+        position = {label: i for i, label in enumerate(categories)}
+        codes = np.where(codes >= 0, np.array([position[label] for label in labels])[codes], -1)
+    return pd.Categorical.from_codes(codes, categories=categories, ordered=True)
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------
+# Rolling-window trend engine.
+# Daily ridership is laid out as a dense
+# (group x day) matrix, and every window for
+# every group is computed in one vectorized pass
+# from a single cumulative sum.
+# --------------------------------------------
+WINDOWS = (7, 28)
+
+# Seasonal baseline: same weekday over the last N weeks
+BASELINE_WEEKS = 4
+
+# Days kept by the incremental state
+HISTORY_DAYS = 7 * BASELINE_WEEKS + 7
+
+# --------------------------------------------
+# Build the dense daily matrix for one grouping
+# column (Route or Boarding Station). Days with
+# no records are filled with zeros.
+# --------------------------------------------
+def daily_matrix(df, group_col, value_col='Passenger Count'):
+    dates = pd.to_datetime(df['Date'])
+    valid = (dates.notna() & df[group_col].notna()).to_numpy()
+    codes, groups = pd.factorize(df[group_col].to_numpy()[valid], sort=True)
+
+    if not len(codes):
+        return {'group_col': group_col, 'groups': groups,
+                'days': pd.DatetimeIndex([]), 'values': np.zeros((0, 0))}
+
+    day = dates[valid]
+    days = pd.date_range(day.min(), day.max(), freq='D')
+    offsets = (day - days[0]).dt.days.to_numpy()
+
+    values = np.bincount(
+        codes * len(days) + offsets,
+        weights=df[value_col].to_numpy(dtype=float)[valid],
+        minlength=len(groups) * len(days)
+    ).reshape(len(groups), len(days))
+
+    return {'group_col': group_col, 'groups': groups, 'days': days, 'values': values}
+
+# --------------------------------------------
+# Shift columns right by `lag` days (NaN fill).
+# --------------------------------------------
+def _shift(values, lag):
+    out = np.full(values.shape, np.nan)
+    if lag < values.shape[1]:
+        out[:, lag:] = values[:, :values.shape[1] - lag]
+    return out
+
+# --------------------------------------------
+# Moving averages, week-over-week change and
+# seasonal baseline for all groups at once.
+# Days before a full window are NaN.
+# --------------------------------------------
+def rolling_windows(values):
+    cum = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+
+    sums = {}
+    for window in set(WINDOWS) | {7}:
+        out = np.full(values.shape, np.nan)
+        if window <= values.shape[1]:
+            out[:, window - 1:] = cum[:, window:] - cum[:, :-window]
+        sums[window] = out
+
+    result = {f'ma{window}': sums[window] / window for window in WINDOWS}
+
+    prev_week = _shift(sums[7], 7)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['wow'] = np.where(prev_week > 0, (sums[7] - prev_week) / prev_week * 100, np.nan)
+
+    result['baseline'] = sum(_shift(values, 7 * k) for k in range(1, BASELINE_WEEKS + 1)) / BASELINE_WEEKS
+    return result
+
+# --------------------------------------------
+# Daily series with trend lines for the whole
+# selection (all groups summed).
+# --------------------------------------------
+def trend_frame(matrix):
+    total = matrix['values'].sum(axis=0, keepdims=True)
+    windows = rolling_windows(total)
+
+    df_roll = pd.DataFrame({'Date': matrix['days'], 'Daily': total[0]})
+    for window in WINDOWS:
+        df_roll[f'{window}-Day Avg'] = windows[f'ma{window}'][0]
+    df_roll['Baseline'] = windows['baseline'][0]
+    return df_roll
+
+# --------------------------------------------
+# Groups with the largest week-over-week change
+# on the latest day.
+# --------------------------------------------
+def week_over_week_movers(matrix, n=10):
+    if not matrix['values'].size:
+        return pd.DataFrame(columns=[matrix['group_col'], 'WoW Change %'])
+
+    wow = rolling_windows(matrix['values'])['wow'][:, -1]
+    df_wow = pd.DataFrame({matrix['group_col']: matrix['groups'], 'WoW Change %': wow}).dropna()
+    top = df_wow['WoW Change %'].abs().sort_values(ascending=False).index[:n]
+    return df_wow.loc[top].sort_values('WoW Change %')
+
+# --------------------------------------------
+# Incremental state for O(1) daily updates.
+# Keeps the last HISTORY_DAYS columns in a ring
+# buffer plus running window sums.
+# --------------------------------------------
+def init_state(matrix):
+    values = matrix['values']
+    history = np.zeros((values.shape[0], HISTORY_DAYS))
+    kept = values[:, -HISTORY_DAYS:]
+    history[:, HISTORY_DAYS - kept.shape[1]:] = kept
+
+    state = {
+        'groups': matrix['groups'],
+        'last_day': matrix['days'][-1] if len(matrix['days']) else None,
+        'history': history,
+        'pos': 0,
+        'prev_week': history[:, -14:-7].sum(axis=1)
+    }
+    for window in set(WINDOWS) | {7}:
+        state[f'sum{window}'] = history[:, -window:].sum(axis=1)
+    return state
+
+# --------------------------------------------
+# Append one day of per-group totals (aligned
+# with state['groups']) and return that day's
+# moving averages, WoW change and baseline.
+# --------------------------------------------
+def append_day(state, day_values):
+    history, pos = state['history'], state['pos']
+    x = np.asarray(day_values, dtype=float)
+
+    def lag(k):
+        return history[:, (pos - k) % HISTORY_DAYS]
+
+    state['prev_week'] = state['prev_week'] + lag(7) - lag(14)
+    for window in set(WINDOWS) | {7}:
+        state[f'sum{window}'] = state[f'sum{window}'] + x - lag(window)
+    baseline = sum(lag(7 * k) for k in range(1, BASELINE_WEEKS + 1)) / BASELINE_WEEKS
+
+    history[:, pos] = x
+    state['pos'] = (pos + 1) % HISTORY_DAYS
+    if state['last_day'] is not None:
+        state['last_day'] += pd.Timedelta(days=1)
+
+    result = {f'ma{window}': state[f'sum{window}'] / window for window in WINDOWS}
+    prev_week = state['prev_week']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['wow'] = np.where(prev_week > 0, (state['sum7'] - prev_week) / prev_week * 100, np.nan)
+    result['baseline'] = baseline
+    return result
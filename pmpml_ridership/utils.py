@@ -8,7 +8,9 @@ def format_inr(number):
     """
     Format a number into Indian numbering style: 12,34,56,789
     """
-    num_str = str(int(number))
+    value = int(number)
+    sign = '-' if value < 0 else ''
+    num_str = str(abs(value))
     last_three = num_str[-3:]
     other_numbers = num_str[:-3]
 
@@ -22,7 +24,7 @@ def format_inr(number):
         other_numbers = other_numbers[:-2]
 
     res = other_numbers + res
-    formatted = res + last_three
+    formatted = sign + res + last_three
     return formatted
 
 # --------------------------------------------
@@ -30,13 +32,14 @@ def format_inr(number):
 # into Indian number format.
 # Returns a new DataFrame with formatted strings.
 # --------------------------------------------
-def format_dataframe_inr(df):
+def format_dataframe_inr(df, exclude=()):
     """
-    Apply Indian number format to all numeric columns in a DataFrame
+    Apply Indian number format to all numeric columns in a DataFrame,
+    except the columns listed in exclude
     """
     df_copy = df.copy()
     for col in df_copy.columns:
-        if df_copy[col].dtype in ['float64', 'int64']:
+        if col not in exclude and df_copy[col].dtype in ['float64', 'int64']:
             df_copy[col] = df_copy[col].apply(format_inr)
     return df_copy
 
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import threading
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pmpml_ridership'))
+import api
+
+ROWS = [
+    ('2023-01-02', 'Route 1', 'Station 1', '07:00-08:00', 10, 100),
+    ('2023-01-02', 'Route 2', 'Station 2', '08:00-09:00', 4, 40),
+    ('2024-01-03', 'Route 1', 'Station 2', '17:00-18:00', 7, 70),
+    ('2024-01-06', 'Route 3', 'Station 1', '09:00-10:00', 2, 20),
+]
+
+@pytest.fixture
+def server(tmp_path):
+    path = tmp_path / 'data.csv'
+    lines = ['Date,Route,Boarding Station,Time Slot,Passenger Count,Fare']
+    lines += [','.join(map(str, row)) for row in ROWS]
+    path.write_text('\n'.join(lines) + '\n')
+
+    server = api.make_server(str(path), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _get(server, path, headers=None):
+    url = f'http://127.0.0.1:{server.server_address[1]}{quote(path, safe="/?=&,")}'
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+# A matching If-None-Match gets a bodyless 304 with the same ETag
+def test_etag_revalidation(server):
+    status, headers, body = _get(server, '/top_routes')
+    assert status == 200
+    assert json.loads(body)[0]['Route'] == 'Route 1'
+    etag = headers['ETag']
+
+    status, headers, body = _get(server, '/top_routes', {'If-None-Match': etag})
+    assert status == 304
+    assert headers['ETag'] == etag
+    assert body == b''
+
+    status, _, _ = _get(server, '/top_routes', {'If-None-Match': '"stale"'})
+    assert status == 200
+
+# Responses are cached per normalized filter set
+def test_cache_key_per_filter(server):
+    service = server.RequestHandlerClass.service
+    _, all_headers, _ = _get(server, '/top_routes')
+    _, route_headers, body = _get(server, '/top_routes?route=Route 2,Route 1')
+    _, same_headers, _ = _get(server, '/top_routes?route=Route 1&route=Route 2&route=Route 1')
+
+    assert route_headers['ETag'] != all_headers['ETag']
+    assert same_headers['ETag'] == route_headers['ETag']
+    assert {r['Route'] for r in json.loads(body)} == {'Route 1', 'Route 2'}
+    assert {key[2] for key in service._cache} == {
+        (None, None, None), (None, ('Route 1', 'Route 2'), None)
+    }
+
+    _get(server, '/top_routes?year=2024')
+    assert (service.version, '/top_routes', ((2024,), None, None)) in service._cache
+
+def test_non_integer_year_is_rejected(server):
+    for path in ('/top_routes?year=20x4', '/export?year=2024,abc'):
+        status, _, body = _get(server, path)
+        assert status == 400
+        assert json.loads(body) == {'error': 'year must be an integer'}
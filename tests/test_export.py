@@ -0,0 +1,15 @@
+import io
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pmpml_ridership'))
+import export
+
+# st.download_button only accepts str, bytes, BytesIO, BufferedReader or
+# RawIOBase from a deferred callable
+def test_export_file_is_a_buffered_reader():
+    df = pd.DataFrame({'Route': ['Route 1', 'Route 2'], 'Passenger Count': [3, 5]})
+    with export.export_file(df) as f:
+        assert isinstance(f, io.BufferedReader)
+        assert pd.read_csv(f).equals(df)
@@ -0,0 +1,37 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pmpml_ridership'))
+import sketch
+
+# Rows with a missing partition key (e.g. an unparsable Date) are skipped
+def test_missing_keys_are_not_counted():
+    df = pd.DataFrame({
+        'Date': ['2024-01-01', '2024-01-01', None, '2024-01-02'],
+        'Route': ['Route 1', 'Route 2', 'Route 3', 'Route 1']
+    })
+    index = sketch.build_distinct_index(df, ['Date'], 'Route')
+
+    assert sketch.count_distinct(index) == 2
+    assert sketch.count_distinct(index, {'Date': ['2024-01-02']}) == 1
+
+# Merging indexes of two chunks gives the counts of one index over both
+def test_merge_matches_single_index():
+    df = pd.DataFrame({
+        'Date': ['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-02', '2024-01-03'],
+        'Route': ['Route 1', 'Route 2', 'Route 2', 'Route 3', 'Route 4']
+    })
+    whole = sketch.build_distinct_index(df, ['Date'], 'Route')
+    merged = sketch.merge_indexes(
+        sketch.build_distinct_index(df.iloc[:3], ['Date'], 'Route'),
+        sketch.build_distinct_index(df.iloc[3:], ['Date'], 'Route')
+    )
+
+    assert np.array_equal(merged['values'], whole['values'])
+    for dates in (None, ['2024-01-02'], ['2024-01-01', '2024-01-03']):
+        for routes in (None, ['Route 2', 'Route 4']):
+            assert sketch.count_distinct(merged, {'Date': dates}, routes) == \
+                sketch.count_distinct(whole, {'Date': dates}, routes) == \
+                df[df['Date'].isin(dates or df['Date']) & df['Route'].isin(routes or df['Route'])]['Route'].nunique()
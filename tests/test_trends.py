@@ -0,0 +1,45 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'pmpml_ridership'))
+import trends
+
+def _matrix(n_groups=5, n_days=90, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 50, size=(n_groups, n_days)).astype(float)
+    values[0, 40:50] = 0  # a route with a quiet fortnight (WoW undefined)
+    return {
+        'group_col': 'Route',
+        'groups': np.array([f'Route {i}' for i in range(n_groups)], dtype=object),
+        'days': pd.date_range('2024-01-01', periods=n_days, freq='D'),
+        'values': values
+    }
+
+# Appending days one at a time gives the batch rolling_windows results
+def test_append_day_matches_rolling_windows():
+    matrix = _matrix()
+    batch = trends.rolling_windows(matrix['values'])
+
+    start = trends.HISTORY_DAYS
+    state = trends.init_state({**matrix, 'days': matrix['days'][:start], 'values': matrix['values'][:, :start]})
+    for day in range(start, matrix['values'].shape[1]):
+        result = trends.append_day(state, matrix['values'][:, day])
+        for name, values in result.items():
+            np.testing.assert_allclose(values, batch[name][:, day], err_msg=f"{name} on day {day}")
+
+    assert state['last_day'] == matrix['days'][-1]
+
+# daily_matrix lays rows out per group and day, zero-filling missing days
+def test_daily_matrix_fills_missing_days():
+    df = pd.DataFrame({
+        'Date': ['2024-01-01', '2024-01-03', '2024-01-03', None],
+        'Route': ['Route 2', 'Route 1', 'Route 2', 'Route 1'],
+        'Passenger Count': [4, 1, 2, 8]
+    })
+    matrix = trends.daily_matrix(df, 'Route')
+
+    assert list(matrix['groups']) == ['Route 1', 'Route 2']
+    assert len(matrix['days']) == 3
+    np.testing.assert_array_equal(matrix['values'], [[0, 0, 1], [4, 0, 2]])